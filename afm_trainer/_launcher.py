@@ -0,0 +1,355 @@
+"""
+Shared helpers for the AFM Trainer launcher scripts.
+Only uses the standard library, since it runs before dependencies are installed.
+"""
+
+import sys
+import subprocess
+import os
+from pathlib import Path
+import json
+import time
+import select
+import shutil
+
+# Checkout containing pyproject.toml and the launcher scripts
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Optional directory of prebuilt wheels that uv installs from before downloading
+WHEELHOUSE_DIR = PROJECT_ROOT / '.wheelhouse'
+
+# Checks tkinter and reports what the launcher needs about the interpreter
+# as one JSON line, so each candidate is only started once
+TKINTER_PROBE = (
+    'import json, sys, tkinter, _tkinter; '
+    'print(json.dumps({"executable": sys.executable, "version": list(sys.version_info[:3])}))'
+)
+
+# uv-managed virtual environment created by `uv sync`
+VENV_DIR = PROJECT_ROOT / '.venv'
+
+
+def _wait_for_exit(process, timeout):
+    """
+    Wait for a process to exit, sleeping in the kernel where possible.
+    
+    Popen.wait() with a timeout polls with short sleeps; a pidfd becomes
+    readable exactly when the child exits.
+    
+    Args:
+        process: Popen object to wait for
+        timeout: Maximum seconds to wait, or None to wait until exit
+        
+    Returns:
+        Exit code, or None if the process is still running
+    """
+    if hasattr(os, 'pidfd_open'):
+        try:
+            pidfd = os.pidfd_open(process.pid)
+        except OSError:
+            pidfd = None  # Kernel without pidfd support (Linux < 5.3)
+        if pidfd is not None:
+            try:
+                poller = select.poll()
+                poller.register(pidfd, select.POLLIN)
+                poller.poll(None if timeout is None else timeout * 1000)
+            finally:
+                os.close(pidfd)
+            return process.wait() if timeout is None else process.poll()
+            
+    try:
+        return process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return None
+
+
+def _run_probes(probes, cwd=None):
+    """
+    Run probe commands concurrently and collect the output of those that
+    exit successfully.
+    
+    Args:
+        probes: List of (command, timeout) tuples
+        cwd: Working directory for the probes
+        
+    Returns:
+        List with each probe's stdout, or None where the probe failed
+    """
+    processes = []
+    for command, timeout in probes:
+        try:
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                       cwd=cwd, text=True, errors='replace')
+        except OSError:
+            process = None
+        processes.append((process, time.monotonic() + timeout))
+        
+    try:
+        # Later probes keep running while an earlier one is waited on; probe
+        # output is small enough to sit in the pipe until the child exits
+        outputs = []
+        for process, deadline in processes:
+            if process is not None and _wait_for_exit(process, max(0, deadline - time.monotonic())) == 0:
+                outputs.append(process.stdout.read())
+            else:
+                outputs.append(None)
+        return outputs
+    finally:
+        for process, _ in processes:
+            if process is None:
+                continue
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+
+
+def check_uv_installed():
+    """Check if UV is installed."""
+    # A PATH lookup is enough; the uv commands that follow report a broken install
+    return shutil.which('uv') is not None
+
+
+def install_uv():
+    """Install UV package manager."""
+    print("UV not found. Installing UV...")
+    try:
+        if sys.platform.startswith('win'):
+            # Windows
+            subprocess.run(['powershell', '-c', 'irm https://astral.sh/uv/install.ps1 | iex'], check=True)
+        else:
+            # macOS/Linux
+            curl = subprocess.Popen(['curl', '-LsSf', 'https://astral.sh/uv/install.sh'],
+                                    stdout=subprocess.PIPE)
+            # Stream the installer script straight into sh
+            installer = subprocess.Popen(['sh'], stdin=curl.stdout)
+            curl.stdout.close()  # Let curl see a closed pipe if sh exits early
+            installer.wait()
+            if curl.wait() != 0:
+                raise subprocess.CalledProcessError(curl.returncode, curl.args)
+            if installer.returncode != 0:
+                raise subprocess.CalledProcessError(installer.returncode, installer.args)
+        
+        print("✓ UV installed successfully!")
+        return True
+    except (subprocess.CalledProcessError, FileNotFoundError) as e:
+        print(f"✗ Failed to install UV: {e}")
+        return False
+
+
+def check_toolkit_directory():
+    """Check if the Apple toolkit directory exists."""
+    # Preferred names first, then any other version matching the prefixes
+    preferred = (".adapter_training_toolkit_v26_0_0", "adapter_training_toolkit_v26_0_0")
+    prefixes = (".adapter_training_toolkit_v", "adapter_training_toolkit_v")
+    
+    # One directory listing; DirEntry.is_dir() avoids a stat per entry
+    candidates = []
+    with os.scandir(Path.cwd()) as entries:
+        for entry in entries:
+            if entry.name.startswith(prefixes) and entry.is_dir():
+                candidates.append(entry)
+                
+    candidates.sort(key=lambda entry: (entry.name not in preferred,
+                                       not entry.name.startswith(prefixes[0])))
+    for entry in candidates:
+        if os.path.exists(os.path.join(entry.path, "examples")):
+            return Path(entry.path)
+            
+    return None
+
+
+def _tkinter_pythons(candidates):
+    """
+    Probe candidate interpreters for tkinter, all at the same time.
+    
+    Args:
+        candidates: Interpreter commands; 'uv' is UV-managed Python
+        
+    Returns:
+        dict: Interpreter details from TKINTER_PROBE for each candidate that
+        can import tkinter
+    """
+    candidates = list(dict.fromkeys(candidates))
+    probes = [
+        (['uv', 'run', 'python', '-c', TKINTER_PROBE], 10) if candidate == 'uv'
+        else ([candidate, '-c', TKINTER_PROBE], 5)
+        for candidate in candidates
+    ]
+    working = {}
+    for candidate, output in zip(candidates, _run_probes(probes, cwd=PROJECT_ROOT)):
+        try:
+            # uv may print its own messages first; the probe's line is last
+            working[candidate] = json.loads(output.strip().splitlines()[-1])
+        except (AttributeError, IndexError, ValueError):
+            continue
+    return working
+
+
+def check_tkinter_support():
+    """Check if Python has tkinter support."""
+    try:
+        # UV-managed Python first, then system Python alternatives
+        python_cmds = ('uv', 'python3', 'python', sys.executable)
+        working = _tkinter_pythons(python_cmds)
+        for python_cmd in python_cmds:
+            if python_cmd in working:
+                return True, python_cmd
+        return False, None
+        
+    except Exception:
+        return False, None
+
+
+def run_command(command, cwd, env=None):
+    """
+    Run a command to completion, returning as soon as it exits.
+    
+    On Ctrl-C the command is asked to terminate, and killed if it does not
+    exit within a few seconds, before KeyboardInterrupt propagates.
+    
+    Args:
+        command: Command and arguments
+        cwd: Working directory for the command
+        env: Environment for the command, or None to inherit
+        
+    Returns:
+        Exit code of the command
+    """
+    process = subprocess.Popen(command, cwd=cwd, env=env)
+    try:
+        return _wait_for_exit(process, None)
+    except KeyboardInterrupt:
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        raise
+
+
+def run_and_exit(command, cwd, env=None):
+    """
+    Hand control to a command and exit with its status.
+    
+    On POSIX the launcher process is replaced with exec, so no idle
+    launcher interpreter stays resident while the command runs. Windows has
+    no true exec, so the command is run as a child there.
+    
+    Args:
+        command: Command and arguments; the first item is looked up on PATH
+        cwd: Working directory for the command
+        env: Environment for the command, or None to inherit
+    """
+    if os.name != 'posix':
+        sys.exit(subprocess.run(command, cwd=cwd, env=env).returncode)
+        
+    sys.stdout.flush()  # Buffered output would be lost with the old image
+    sys.stderr.flush()
+    os.chdir(cwd)
+    if env is None:
+        os.execvp(command[0], command)
+    os.execvpe(command[0], command, env)
+
+
+def uv_environment():
+    """
+    Environment for uv install commands.
+    
+    When a .wheelhouse directory exists it is added as a package source, so
+    wheels placed there are not downloaded again.
+    
+    Returns:
+        Environment dict, or None to inherit the current environment
+    """
+    if 'UV_FIND_LINKS' in os.environ or not WHEELHOUSE_DIR.is_dir():
+        return None
+    return {**os.environ, 'UV_FIND_LINKS': str(WHEELHOUSE_DIR)}
+
+
+_venv_site_packages = None
+
+
+def venv_python_version():
+    """
+    Read the Python version of the uv virtual environment from .venv/pyvenv.cfg.
+    
+    Returns:
+        tuple: (major, minor), or None if the venv has not been created
+    """
+    try:
+        config = (VENV_DIR / 'pyvenv.cfg').read_text()
+    except OSError:
+        return None
+    version = next((line.partition('=')[2].strip() for line in config.splitlines()
+                    if line.partition('=')[0].strip() in ('version_info', 'version')), '')
+    try:
+        major, minor = version.split('.')[:2]
+        return int(major), int(minor)
+    except ValueError:
+        return None
+
+
+def venv_site_packages():
+    """
+    Locate site-packages of the uv virtual environment.
+    
+    The Python version is read from .venv/pyvenv.cfg, so venvs created with
+    any interpreter uv picks are found without starting it. The result is
+    kept once the venv exists.
+    
+    Returns:
+        Path to site-packages, or None if the venv has not been created
+    """
+    global _venv_site_packages
+    if _venv_site_packages is None:
+        if sys.platform == 'win32':
+            site_packages = VENV_DIR / 'Lib' / 'site-packages'
+        else:
+            version = venv_python_version()
+            if version is None:
+                return None
+            site_packages = VENV_DIR / 'lib' / f'python{version[0]}.{version[1]}' / 'site-packages'
+        if site_packages.is_dir():
+            _venv_site_packages = site_packages
+    return _venv_site_packages
+
+
+def setup_linux_environment():
+    """Set up Linux-specific environment variables."""
+    return {
+        'QT_X11_NO_MITSHM': '1',
+        'XLIB_SKIP_ARGB_VISUALS': '1',
+        'XDG_SESSION_TYPE': 'x11',
+        'AFM_TRAINER_LINUX_MODE': '1',
+        'PYTHONUNBUFFERED': '1'
+    }
+
+
+def find_working_python_linux():
+    """Find a Python installation with tkinter that works on Linux."""
+    # Priority order: conda environments, system Python, UV Python
+    python_candidates = (
+        '/usr/bin/python3',
+        '/usr/bin/python',
+        'python3',
+        'python'
+    )
+    
+    # The GUI needs Python 3.11+. When the venv's packages are put on
+    # PYTHONPATH, its extension modules only load in the same major.minor
+    venv_version = venv_python_version()
+    working = _tkinter_pythons(python_candidates)
+    for python_path in python_candidates:
+        info = working.get(python_path)
+        if not info:
+            continue
+        version = tuple(info["version"][:2])
+        if venv_version:
+            usable = version == venv_version
+        else:
+            usable = version >= (3, 11)
+        if usable:
+            return info["executable"]
+    return None
@@ -0,0 +1,128 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Compiled progress line parser for AFM Trainer.
+Optional fast path for TrainingController; build in place with
+``cythonize -i afm_trainer/_line_parser.pyx``. Matching mirrors
+_EPOCH_RE, _BATCH_RE and _LOSS_RE in training_controller, which are
+used when this module is not compiled.
+"""
+
+from libc.string cimport memcmp
+
+
+cdef inline bint _is_digit(unsigned char c) nogil:
+    return 48 <= c <= 57
+
+
+cdef inline bint _is_space(unsigned char c) nogil:
+    # Same set as \s in a bytes pattern: space, \t, \n, \v, \f, \r
+    return c == 32 or 9 <= c <= 13
+
+
+cdef Py_ssize_t _match_ratio(const unsigned char *s, Py_ssize_t i, Py_ssize_t n,
+                             Py_ssize_t *slash) nogil:
+    """Match digits/digits at i; return the end index or -1, storing the '/' index."""
+    cdef Py_ssize_t j = i
+    cdef Py_ssize_t k
+    while j < n and _is_digit(s[j]):
+        j += 1
+    if j == i or j >= n or s[j] != 47:  # '/'
+        return -1
+    k = j + 1
+    while k < n and _is_digit(s[k]):
+        k += 1
+    if k == j + 1:
+        return -1
+    slash[0] = j
+    return k
+
+
+cdef Py_ssize_t _find_epoch(const unsigned char *s, Py_ssize_t n,
+                            Py_ssize_t *start, Py_ssize_t *slash) nogil:
+    """Search for Epoch (\\d+)/(\\d+); return the end index or -1."""
+    cdef Py_ssize_t i = 0
+    cdef Py_ssize_t end
+    while i <= n - 6:
+        if s[i] == 69 and memcmp(s + i, b"Epoch ", 6) == 0:  # 'E'
+            end = _match_ratio(s, i + 6, n, slash)
+            if end >= 0:
+                start[0] = i + 6
+                return end
+        i += 1
+    return -1
+
+
+cdef Py_ssize_t _find_batch(const unsigned char *s, Py_ssize_t n,
+                            Py_ssize_t *start, Py_ssize_t *slash) nogil:
+    """Search for Training.*?(\\d+)/(\\d+); return the end index or -1."""
+    cdef Py_ssize_t i = 0
+    cdef Py_ssize_t j, end
+    while i <= n - 8:
+        if s[i] == 84 and memcmp(s + i, b"Training", 8) == 0:  # 'T'
+            j = i + 8
+            while j < n and s[j] != 10:
+                if _is_digit(s[j]):
+                    end = _match_ratio(s, j, n, slash)
+                    if end >= 0:
+                        start[0] = j
+                        return end
+                j += 1
+            # Any later "Training" before this newline scans a subset of
+            # the same span, so resume after it
+            i = j
+            continue
+        i += 1
+    return -1
+
+
+cdef Py_ssize_t _find_loss(const unsigned char *s, Py_ssize_t n,
+                           Py_ssize_t *start) nogil:
+    """Search for (?i:loss)[=:]?\\s*([0-9.]+); return the end index or -1."""
+    cdef Py_ssize_t i = 0
+    cdef Py_ssize_t j, end
+    while i <= n - 4:
+        if ((s[i] | 32) == 108 and (s[i + 1] | 32) == 111
+                and (s[i + 2] | 32) == 115 and (s[i + 3] | 32) == 115):
+            j = i + 4
+            if j < n and (s[j] == 61 or s[j] == 58):  # '=' or ':'
+                j += 1
+            while j < n and _is_space(s[j]):
+                j += 1
+            end = j
+            while end < n and (_is_digit(s[end]) or s[end] == 46):  # '.'
+                end += 1
+            if end > j:
+                start[0] = j
+                return end
+        i += 1
+    return -1
+
+
+def parse_progress_line(bytes line):
+    """
+    Extract the first epoch, batch and loss fields from a training output line.
+
+    Args:
+        line: Raw output line without terminator
+
+    Returns:
+        tuple: (epoch, total_epochs, batch, total_batches, loss) as bytes or None
+    """
+    cdef const unsigned char *s = line
+    cdef Py_ssize_t n = len(line)
+    cdef Py_ssize_t end, start = 0, slash = 0
+
+    # Each field is searched over the whole line, like the regex fallback
+    epoch = total_epochs = batch = total_batches = loss = None
+    end = _find_epoch(s, n, &start, &slash)
+    if end >= 0:
+        epoch = line[start:slash]
+        total_epochs = line[slash + 1:end]
+    end = _find_batch(s, n, &start, &slash)
+    if end >= 0:
+        batch = line[start:slash]
+        total_batches = line[slash + 1:end]
+    end = _find_loss(s, n, &start)
+    if end >= 0:
+        loss = line[start:end]
+    return epoch, total_epochs, batch, total_batches, loss
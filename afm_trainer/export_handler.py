@@ -6,10 +6,12 @@ Handles exporting trained adapters to .fmadapter format.
 import subprocess
 import sys
 import os
+import io
 from pathlib import Path
 from typing import Dict, Any, Optional, Callable
 import logging
 import json
+from collections import deque
 
 
 class ExportHandler:
@@ -84,18 +86,14 @@ class ExportHandler:
                 export_cmd,
                 cwd=toolkit_dir,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True,
-                bufsize=1
+                stderr=subprocess.STDOUT
             )
             
             # Stream output in real-time
             output_lines = []
-            for line in iter(process.stdout.readline, ''):
-                line = line.strip()
-                if line:
-                    output_lines.append(line)
-                    _log(f"[Export] {line}")
+            for line in self._iter_output_lines(process):
+                output_lines.append(line)
+                _log(f"[Export] {line}")
                     
             # Wait for process completion
             return_code = process.wait()
@@ -105,23 +103,13 @@ class ExportHandler:
                 
             # Verify export success
             adapter_path = output_dir / f"{config['adapter_name']}.fmadapter"
-            if adapter_path.exists():
-                _log(f"✅ Adapter exported successfully to: {adapter_path}")
-                _log(f"📦 Export size: {self._get_directory_size(adapter_path)}")
-                
-                # List contents of the exported adapter
-                _log("📋 Exported adapter contents:")
-                for item in sorted(adapter_path.iterdir()):
-                    if item.is_file():
-                        size = item.stat().st_size
-                        _log(f"   📄 {item.name} ({self._format_size(size)})")
-                    elif item.is_dir():
-                        _log(f"   📁 {item.name}/")
-                        
-                return True
-            else:
+            try:
+                self._summarize_export(adapter_path, _log)
+            except FileNotFoundError:
                 raise Exception("Export completed but .fmadapter file not found")
                 
+            return True
+                
         except subprocess.CalledProcessError as e:
             error_msg = f"Export command failed with return code {e.returncode}"
             _log(f"❌ {error_msg}")
@@ -134,6 +122,53 @@ class ExportHandler:
             self.logger.error(f"Export failed: {e}")
             return False
             
+    def _iter_output_lines(self, process: subprocess.Popen):
+        """
+        Yield stripped, non-empty output lines from a process.
+        
+        The binary pipe is wrapped with newline='' so lines are split on any
+        line ending without running the universal newline translation pass;
+        strip() already removes the terminators.
+        
+        Args:
+            process: Subprocess with a binary stdout pipe
+            
+        Yields:
+            str: Output lines
+        """
+        stdout = io.TextIOWrapper(process.stdout, encoding='utf-8', errors='replace', newline='')
+        for line in iter(stdout.readline, ''):
+            line = line.strip()
+            if line:
+                yield line
+                
+    def _summarize_export(self, adapter_path: Path, _log: Callable[[str], None]):
+        """
+        Log the location, size and contents of an exported adapter.
+        
+        Args:
+            adapter_path: Path to the exported .fmadapter directory
+            _log: Logging helper
+            
+        Raises:
+            FileNotFoundError: If the .fmadapter directory does not exist
+        """
+        # Scanning the directory doubles as the existence check
+        with os.scandir(adapter_path) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+            
+        _log(f"✅ Adapter exported successfully to: {adapter_path}")
+        _log(f"📦 Export size: {self._get_directory_size(adapter_path)}")
+        
+        # List contents of the exported adapter
+        _log("📋 Exported adapter contents:")
+        for entry in entries:
+            if entry.is_file():
+                size = entry.stat().st_size
+                _log(f"   📄 {entry.name} ({self._format_size(size)})")
+            elif entry.is_dir():
+                _log(f"   📁 {entry.name}/")
+                
     def _find_latest_checkpoint(self, output_dir: Path, checkpoint_type: str) -> Optional[Path]:
         """
         Find the latest checkpoint of the specified type.
@@ -284,21 +319,31 @@ class ExportHandler:
             
             self.logger.info(f"Asset pack command: {' '.join(asset_cmd)}")
             
-            # Run asset pack creation
-            result = subprocess.run(
+            # Run asset pack creation, streaming output to the log
+            process = subprocess.Popen(
                 asset_cmd,
                 cwd=toolkit_dir,
-                capture_output=True,
-                text=True,
-                check=True
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT
             )
             
-            self.logger.info(f"Asset pack creation successful: {result.stdout}")
+            # Only keep the tail of the output for error reporting
+            output_tail = deque(maxlen=200)
+            for line in self._iter_output_lines(process):
+                output_tail.append(line)
+                self.logger.info(f"[Asset Pack] {line}")
+                    
+            return_code = process.wait()
+            
+            if return_code != 0:
+                raise subprocess.CalledProcessError(return_code, asset_cmd, output='\n'.join(output_tail))
+                
+            self.logger.info("Asset pack creation successful")
             return True
             
         except subprocess.CalledProcessError as e:
             self.logger.error(f"Asset pack creation failed: {e}")
-            self.logger.error(f"Asset pack stderr: {e.stderr}")
+            self.logger.error(f"Asset pack output: {e.output}")
             return False
         except Exception as e:
             self.logger.error(f"Asset pack creation failed: {e}")
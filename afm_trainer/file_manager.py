@@ -4,12 +4,384 @@ Handles file operations, validation, and .gitignore management.
 """
 
 import os
+import sys
+import subprocess
 import json
 import shutil
+import copy
+import mmap
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 import logging
 import re
+import functools
+import hashlib
+import operator
+
+try:
+    import simdjson
+    SIMDJSON_AVAILABLE = True
+    _JSON_LIST_TYPES = (list, simdjson.Array)
+    _JSON_DICT_TYPES = (dict, simdjson.Object)
+except ImportError:
+    SIMDJSON_AVAILABLE = False
+    simdjson = None
+    _JSON_LIST_TYPES = (list,)
+    _JSON_DICT_TYPES = (dict,)
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+# Read size used when a JSONL file can't be memory-mapped
+JSONL_READ_CHUNK_SIZE = 1 << 20
+
+# Number of validation/preview results kept per FileManager
+VALIDATION_CACHE_SIZE = 32
+
+# Chat roles accepted in training data, as bit flags
+VALID_ROLES = ["system", "user", "assistant"]
+_ROLE_SYSTEM = 1
+_ROLE_USER = 2
+_ROLE_ASSISTANT = 4
+_ROLE_CODES = {"system": _ROLE_SYSTEM, "user": _ROLE_USER, "assistant": _ROLE_ASSISTANT}
+_TURN_ROLES = _ROLE_USER | _ROLE_ASSISTANT
+_get_role_content = operator.itemgetter('role', 'content')
+
+# Number of error messages kept in validation stats
+MAX_REPORTED_ERRORS = 5
+
+# Files at least this large are validated in parallel worker processes
+PARALLEL_VALIDATION_MIN_BYTES = 64 << 20
+VALIDATION_MAX_WORKERS = 8
+
+# Units used by format_file_size
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB')
+_SIZE_SCALES = (1.0, 1024.0, 1048576.0, 1073741824.0)
+
+# Longest we wait for `du` before walking the directory ourselves
+DU_TIMEOUT_SECONDS = 30
+
+# Maps whitespace bytes to b' ' and everything else to b'x'; the set matches
+# str.isspace() for ASCII, which includes the \x1c-\x1f separators
+_WORD_CLASS_TABLE = bytes.maketrans(
+    bytes(range(256)),
+    bytes(32 if byte == 32 or 9 <= byte <= 13 or 28 <= byte <= 31 else 120 for byte in range(256))
+)
+
+
+def _count_words_bytes(buf: bytes) -> int:
+    """Count whitespace-separated words in ASCII bytes."""
+    count = 0
+    in_word = False
+    for byte in buf:
+        # space, \t, \n, \v, \f, \r and the \x1c-\x1f separators
+        if byte == 32 or 9 <= byte <= 13 or 28 <= byte <= 31:
+            in_word = False
+        elif not in_word:
+            in_word = True
+            count += 1
+    return count
+
+
+@functools.lru_cache(maxsize=None)
+def _get_word_count_kernel():
+    """Compile the word counter with Numba, if installed (deferred to avoid startup penalty)."""
+    try:
+        from numba import njit
+    except ImportError:
+        return None
+    return njit(cache=True)(_count_words_bytes)
+
+
+def _count_words(text: str) -> int:
+    """
+    Count whitespace-separated words without building a list of substrings.
+    
+    Gives the same result as len(text.split()). Only ASCII text takes the
+    byte-level path; other text can contain Unicode whitespace such as
+    U+00A0 or U+3000, so it is split normally.
+    
+    Args:
+        text: Text to count
+        
+    Returns:
+        Number of words
+    """
+    if not text.isascii():
+        return len(text.split())
+        
+    buf = text.encode('ascii')
+    kernel = _get_word_count_kernel()
+    if kernel is not None:
+        return kernel(buf)
+        
+    # Without Numba, count word starts in C on a normalized copy
+    classes = buf.translate(_WORD_CLASS_TABLE)
+    return classes.count(b' x') + classes.startswith(b'x')
+
+
+def _iter_jsonl_lines(file_path, start: int = 0, end: Optional[int] = None):
+    """
+    Iterate over the raw lines of a JSONL file.
+    
+    The file is memory-mapped and split on newlines, so lines are handed
+    to the JSON parser as undecoded bytes without read() copies. Files
+    that can't be mapped are read in large chunks into a reusable buffer.
+    
+    Args:
+        file_path: Path to the JSONL file
+        start: Byte offset of the first line to read
+        end: Byte offset to stop at (defaults to end of file)
+        
+    Yields:
+        Each line as bytes, without the trailing newline
+    """
+    with open(file_path, 'rb', buffering=0) as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Empty files and pipes can't be mapped
+            mm = None
+            
+        if mm is not None:
+            with mm:
+                if end is None:
+                    end = len(mm)
+                pos = start
+                while (idx := mm.find(b'\n', pos, end)) != -1:
+                    yield mm[pos:idx]
+                    pos = idx + 1
+                if pos < end:
+                    yield mm[pos:end]
+            return
+            
+        # Fall back to reading into one reusable buffer; only complete lines are copied out
+        if start:
+            f.seek(start)
+        remaining = end - start if end is not None else -1
+        buf = bytearray(JSONL_READ_CHUNK_SIZE)
+        view = memoryview(buf)
+        carry = bytearray()
+        while remaining:
+            n = f.readinto(view if remaining < 0 or remaining >= len(buf) else view[:remaining])
+            if not n:
+                break
+            if remaining > 0:
+                remaining -= n
+                
+            pos = 0
+            while (idx := buf.find(b'\n', pos, n)) != -1:
+                if carry:
+                    carry += view[pos:idx]
+                    yield bytes(carry)
+                    carry.clear()
+                else:
+                    yield bytes(view[pos:idx])
+                pos = idx + 1
+            carry += view[pos:n]
+            
+        if carry:
+            yield bytes(carry)
+
+
+def _display_role_content(item: Dict[str, Any]) -> Tuple[str, str]:
+    """Get a message's role and content, with defaults for missing fields."""
+    try:
+        return _get_role_content(item)
+    except KeyError:
+        return item.get('role', 'unknown'), item.get('content', '')
+
+
+def _parse_json_line(parser, line: bytes) -> Any:
+    """
+    Parse a single JSONL line, preferring simdjson when available.
+    
+    Args:
+        parser: Reusable simdjson parser, or None to use the json module
+        line: Line to parse
+        
+    Returns:
+        Parsed document (simdjson proxies for objects and arrays)
+    """
+    if parser is not None:
+        try:
+            return parser.parse(line)
+        except ValueError:
+            # Re-parse with json to get its error message
+            pass
+    return json.loads(line)
+
+
+def _json_type_name(value: Any) -> str:
+    """Get the Python type name of a parsed JSON value."""
+    if isinstance(value, _JSON_DICT_TYPES):
+        return "dict"
+    if isinstance(value, _JSON_LIST_TYPES):
+        return "list"
+    return type(value).__name__
+
+
+# Per-message checks, specialized by _compile_message_validator
+_MESSAGE_VALIDATOR_TEMPLATE = """
+def validate_messages(data):
+    role_mask = 0
+    turn_count = 0
+    sample_tokens = 0
+    for i, item in enumerate(data):
+        if type(item) not in dict_types:
+            return f", item {i}: Expected dict, got {json_type_name(item)}", role_mask, 0, 0
+{fields_code}
+        role_code = role_codes.get(role, 0) if type(role) is str else 0
+        if not role_code:
+            return f", item {i}: Invalid role '{role}', must be one of {valid_roles}", role_mask, 0, 0
+{stats_code}
+    return None, role_mask, turn_count, sample_tokens
+"""
+
+_MESSAGE_FIELDS_CODE = """
+        try:
+            role, content = get_role_content(item)
+        except KeyError:
+            return f", item {i}: Missing 'role' or 'content' field", role_mask, 0, 0
+"""
+
+# Without statistics only the role value is read; content is checked for
+# presence so simdjson never builds a str for it
+_MESSAGE_ROLE_ONLY_CODE = """
+        if 'role' not in item or 'content' not in item:
+            return f", item {i}: Missing 'role' or 'content' field", role_mask, 0, 0
+        role = item['role']
+"""
+
+_MESSAGE_STATS_CODE = """
+        role_mask |= role_code
+        if role_code & turn_roles:
+            turn_count += 1
+        # Rough token count (words * 1.3)
+        sample_tokens += count_words(content) * 1.3
+"""
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_message_validator(collect_stats: bool):
+    """
+    Build the per-sample message validator for the fixed chat schema.
+    
+    The function is generated at runtime so the 'basic' level carries no
+    statistics code at all, and exact type checks replace isinstance calls.
+    
+    Args:
+        collect_stats: Whether to track roles, turns and tokens
+        
+    Returns:
+        validate_messages(data) -> (error_detail, role_mask, turn_count, sample_tokens)
+    """
+    source = _MESSAGE_VALIDATOR_TEMPLATE.replace(
+        "{fields_code}", _MESSAGE_FIELDS_CODE if collect_stats else _MESSAGE_ROLE_ONLY_CODE
+    ).replace(
+        "{stats_code}", _MESSAGE_STATS_CODE if collect_stats else ""
+    )
+    namespace = {
+        'dict_types': frozenset(_JSON_DICT_TYPES),
+        'get_role_content': _get_role_content,
+        'json_type_name': _json_type_name,
+        'role_codes': _ROLE_CODES,
+        'valid_roles': VALID_ROLES,
+        'turn_roles': _TURN_ROLES,
+        'count_words': _count_words,
+    }
+    exec(compile(source, "<afm_trainer message validator>", "exec"), namespace)
+    return namespace['validate_messages']
+
+
+def _scan_jsonl_lines(lines, level: str) -> Dict[str, Any]:
+    """
+    Validate raw JSONL lines and collect sample counts.
+    
+    Args:
+        lines: Iterable of raw lines
+        level: Validation level ('full' or 'basic')
+        
+    Returns:
+        Partial results: counts, token total, role flags and up to
+        MAX_REPORTED_ERRORS (line_number, detail) errors, with line numbers
+        relative to the first line scanned
+    """
+    result = {
+        'total_lines': 0,
+        'valid_samples': 0,
+        'invalid_samples': 0,
+        'has_system_messages': 0,
+        'has_multi_turn': 0,
+        'total_tokens': 0,
+        'roles_mask': 0,
+        'errors': []
+    }
+    
+    collect_stats = level == 'full'
+    validate_messages = _compile_message_validator(collect_stats)
+    errors = result['errors']
+    roles_mask = 0
+    
+    # One parser reused for every line; its documents are read lazily
+    parser = simdjson.Parser() if SIMDJSON_AVAILABLE else None
+    
+    for line_num, line in enumerate(lines, 1):
+        result['total_lines'] += 1
+        
+        line = line.strip()
+        if not line:
+            continue
+            
+        # simdjson refuses to reuse a parser while proxies into it are alive
+        data = None
+        error = None
+        
+        try:
+            data = _parse_json_line(parser, line)
+            
+            # Handle wrapped format {"messages": [...]}
+            if isinstance(data, _JSON_DICT_TYPES) and "messages" in data:
+                data = data["messages"]
+                
+            # Check if it's a list (expected format), then validate message structure
+            if not isinstance(data, _JSON_LIST_TYPES):
+                error = f": Expected list format, got {_json_type_name(data)}"
+            else:
+                error, role_mask, turn_count, sample_tokens = validate_messages(data)
+                roles_mask |= role_mask
+            
+        except json.JSONDecodeError as e:
+            error = f": Invalid JSON - {str(e)}"
+            
+        if error is not None:
+            result['invalid_samples'] += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append((line_num, error))
+            continue
+            
+        result['valid_samples'] += 1
+        if collect_stats:
+            if role_mask & _ROLE_SYSTEM:
+                result['has_system_messages'] += 1
+            if turn_count > 2:  # More than one user-assistant exchange
+                result['has_multi_turn'] += 1
+            result['total_tokens'] += sample_tokens
+            
+    result['roles_mask'] = roles_mask
+    return result
+
+
+def _scan_jsonl_range(file_path: str, start: int, end: int, level: str) -> Dict[str, Any]:
+    """Scan one line-aligned byte range of a JSONL file (process pool worker)."""
+    return _scan_jsonl_lines(_iter_jsonl_lines(file_path, start, end), level)
 
 
 class FileManager:
@@ -17,13 +389,20 @@ class FileManager:
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        # LRU caches keyed by (path, mtime, size, ...) so unchanged files aren't re-parsed
+        self._validation_cache: OrderedDict = OrderedDict()
+        self._preview_cache: OrderedDict = OrderedDict()
+        # .gitignore path -> file signature, content hash and toolkit entries known to be present
+        self._gitignore_state: Dict[str, Dict[str, Any]] = {}
         
-    def validate_jsonl_file(self, file_path: str) -> Tuple[bool, str, Dict[str, Any]]:
+    def validate_jsonl_file(self, file_path: str, level: str = 'full') -> Tuple[bool, str, Dict[str, Any]]:
         """
         Validate a JSONL file format and content.
         
         Args:
             file_path: Path to the JSONL file
+            level: 'full' to collect all dataset statistics, or 'basic' to only
+                check structure and count valid/invalid samples
             
         Returns:
             tuple[bool, str, dict]: (is_valid, error_message, stats)
@@ -40,114 +419,138 @@ class FileManager:
             if file_path_obj.suffix.lower() != ".jsonl":
                 return False, "File must have .jsonl extension", {}
                 
-            stats = {
-                'total_lines': 0,
-                'valid_samples': 0,
-                'invalid_samples': 0,
-                'has_system_messages': 0,
-                'has_multi_turn': 0,
-                'average_tokens_per_sample': 0,
-                'roles_found': set()
-            }
-            
-            total_tokens = 0
-            
-            with open(file_path_obj, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    stats['total_lines'] += 1
-                    
-                    line = line.strip()
-                    if not line:
-                        continue
-                        
-                    try:
-                        data = json.loads(line)
-                        
-                        # Handle wrapped format {"messages": [...]}
-                        if isinstance(data, dict) and "messages" in data:
-                            data = data["messages"]
-                            
-                        # Check if it's a list (expected format)
-                        if not isinstance(data, list):
-                            stats['invalid_samples'] += 1
-                            if line_num <= 5:  # Only report first few errors
-                                return False, f"Line {line_num}: Expected list format, got {type(data).__name__}", stats
-                            continue
-                            
-                        # Validate message structure
-                        valid_sample = True
-                        has_system = False
-                        turn_count = 0
-                        sample_tokens = 0
-                        
-                        for i, item in enumerate(data):
-                            if not isinstance(item, dict):
-                                valid_sample = False
-                                if line_num <= 5:
-                                    return False, f"Line {line_num}, item {i}: Expected dict, got {type(item).__name__}", stats
-                                break
-                                
-                            if "role" not in item or "content" not in item:
-                                valid_sample = False
-                                if line_num <= 5:
-                                    return False, f"Line {line_num}, item {i}: Missing 'role' or 'content' field", stats
-                                break
-                                
-                            role = item["role"]
-                            content = item["content"]
-                            
-                            valid_roles = ["system", "user", "assistant"]
-                            if role not in valid_roles:
-                                valid_sample = False
-                                if line_num <= 5:
-                                    return False, f"Line {line_num}, item {i}: Invalid role '{role}', must be one of {valid_roles}", stats
-                                break
-                                
-                            stats['roles_found'].add(role)
-                            
-                            if role == "system":
-                                has_system = True
-                                
-                            if role in ["user", "assistant"]:
-                                turn_count += 1
-                                
-                            # Rough token count (words * 1.3)
-                            sample_tokens += len(content.split()) * 1.3
-                            
-                        if valid_sample:
-                            stats['valid_samples'] += 1
-                            if has_system:
-                                stats['has_system_messages'] += 1
-                            if turn_count > 2:  # More than one user-assistant exchange
-                                stats['has_multi_turn'] += 1
-                            total_tokens += sample_tokens
-                        else:
-                            stats['invalid_samples'] += 1
-                            
-                    except json.JSONDecodeError as e:
-                        stats['invalid_samples'] += 1
-                        if line_num <= 5:
-                            return False, f"Line {line_num}: Invalid JSON - {str(e)}", stats
-                        continue
-                        
-            if stats['total_lines'] == 0:
-                return False, "File is empty", stats
-                
-            if stats['valid_samples'] == 0:
-                return False, "No valid samples found", stats
+            cache_key = self._file_cache_key(file_path_obj, level)
+            cached = self._validation_cache.get(cache_key)
+            if cached is not None:
+                self._validation_cache.move_to_end(cache_key)
+                return copy.deepcopy(cached)
                 
-            # Calculate average tokens
-            if stats['valid_samples'] > 0:
-                stats['average_tokens_per_sample'] = int(total_tokens / stats['valid_samples'])
-                
-            # Convert set to list for JSON serialization
-            stats['roles_found'] = list(stats['roles_found'])
+            result = self._validate_jsonl_contents(file_path_obj, level)
             
-            return True, "", stats
+            self._validation_cache[cache_key] = copy.deepcopy(result)
+            if len(self._validation_cache) > VALIDATION_CACHE_SIZE:
+                self._validation_cache.popitem(last=False)
+                
+            return result
             
         except Exception as e:
             return False, f"Validation error: {str(e)}", {}
             
+    def _validate_jsonl_contents(self, file_path_obj: Path, level: str) -> Tuple[bool, str, Dict[str, Any]]:
+        """
+        Parse a JSONL file and collect validation statistics.
+        
+        Large files are split on line boundaries and scanned in parallel
+        worker processes; the partial results are merged in file order.
+        
+        Args:
+            file_path_obj: Path to the JSONL file
+            level: Validation level ('full' or 'basic')
+            
+        Returns:
+            tuple[bool, str, dict]: (is_valid, error_message, stats)
+        """
+        parts = None
+        file_size = file_path_obj.stat().st_size
+        workers = min(os.cpu_count() or 1, VALIDATION_MAX_WORKERS)
+        
+        if file_size >= PARALLEL_VALIDATION_MIN_BYTES and workers > 1:
+            ranges = self._split_jsonl_ranges(file_path_obj, file_size, workers)
+            try:
+                # Workers are spawned rather than forked from the threaded GUI process
+                with ProcessPoolExecutor(max_workers=len(ranges),
+                                         mp_context=multiprocessing.get_context('spawn')) as executor:
+                    parts = list(executor.map(
+                        _scan_jsonl_range,
+                        [str(file_path_obj)] * len(ranges),
+                        [start for start, _ in ranges],
+                        [end for _, end in ranges],
+                        [level] * len(ranges)
+                    ))
+            except Exception as e:
+                # Any worker failure (including BrokenProcessPool) is retried serially
+                self.logger.warning(f"Parallel validation failed, scanning serially: {e}")
+                
+        if parts is None:
+            parts = [_scan_jsonl_lines(_iter_jsonl_lines(file_path_obj), level)]
+            
+        stats = {
+            'total_lines': 0,
+            'valid_samples': 0,
+            'invalid_samples': 0,
+            'has_system_messages': 0,
+            'has_multi_turn': 0,
+            'average_tokens_per_sample': 0,
+            'roles_found': [],
+            'errors': []
+        }
+        
+        total_tokens = 0
+        roles_mask = 0
+        first_error = None
+        
+        for part in parts:
+            line_offset = stats['total_lines']
+            for line_num, detail in part['errors']:
+                message = f"Line {line_offset + line_num}{detail}"
+                if len(stats['errors']) < MAX_REPORTED_ERRORS:
+                    stats['errors'].append(message)
+                # Errors in the first few lines fail the whole file
+                if first_error is None and line_offset + line_num <= 5:
+                    first_error = message
+                    
+            for key in ('total_lines', 'valid_samples', 'invalid_samples',
+                        'has_system_messages', 'has_multi_turn'):
+                stats[key] += part[key]
+            total_tokens += part['total_tokens']
+            roles_mask |= part['roles_mask']
+            
+        # Calculate average tokens
+        if stats['valid_samples'] > 0:
+            stats['average_tokens_per_sample'] = int(total_tokens / stats['valid_samples'])
+            
+        # Expand the role flags into a list (JSON serializable)
+        stats['roles_found'] = [role for role in VALID_ROLES if roles_mask & _ROLE_CODES[role]]
+        
+        if stats['total_lines'] == 0:
+            return False, "File is empty", stats
+            
+        if first_error is not None:
+            return False, first_error, stats
+            
+        if stats['valid_samples'] == 0:
+            return False, "No valid samples found", stats
+            
+        return True, "", stats
+        
+    def _split_jsonl_ranges(self, file_path_obj: Path, file_size: int, parts: int) -> List[Tuple[int, int]]:
+        """
+        Split a file into roughly equal byte ranges that start on line boundaries.
+        
+        Args:
+            file_path_obj: Path to the JSONL file
+            file_size: Size of the file in bytes
+            parts: Number of ranges wanted
+            
+        Returns:
+            List of (start, end) byte offsets
+        """
+        bounds = [0]
+        with open(file_path_obj, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for k in range(1, parts):
+                idx = mm.find(b'\n', max(bounds[-1], file_size * k // parts))
+                if idx == -1:
+                    break
+                bounds.append(idx + 1)
+        bounds.append(file_size)
+        
+        return [(start, end) for start, end in zip(bounds, bounds[1:]) if start < end]
+        
+    def _file_cache_key(self, file_path_obj: Path, *extra) -> tuple:
+        """Build a cache key that changes whenever the file is modified."""
+        st = file_path_obj.stat()
+        return (str(file_path_obj.resolve()), st.st_mtime_ns, st.st_size) + extra
+        
     def preview_dataset(self, file_path: str, num_samples: int = 3) -> List[Dict[str, Any]]:
         """
         Preview a few samples from a JSONL dataset.
@@ -166,32 +569,41 @@ class FileManager:
             if not file_path_obj.exists():
                 return samples
                 
-            with open(file_path_obj, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f):
-                    if len(samples) >= num_samples:
-                        break
-                        
-                    line = line.strip()
-                    if not line:
-                        continue
+            cache_key = self._file_cache_key(file_path_obj, num_samples)
+            cached = self._preview_cache.get(cache_key)
+            if cached is not None:
+                self._preview_cache.move_to_end(cache_key)
+                return copy.deepcopy(cached)
+                
+            for line_num, line in enumerate(_iter_jsonl_lines(file_path_obj)):
+                if len(samples) >= num_samples:
+                    break
+                    
+                line = line.strip()
+                if not line:
+                    continue
+                    
+                try:
+                    data = json.loads(line)
+                    
+                    # Handle wrapped format
+                    if isinstance(data, dict) and "messages" in data:
+                        data = data["messages"]
                         
-                    try:
-                        data = json.loads(line)
-                        
-                        # Handle wrapped format
-                        if isinstance(data, dict) and "messages" in data:
-                            data = data["messages"]
-                            
-                        if isinstance(data, list):
-                            samples.append({
-                                'line_number': line_num + 1,
-                                'data': data,
-                                'formatted': self._format_sample_for_display(data)
-                            })
-                            
-                    except json.JSONDecodeError:
-                        continue
+                    if isinstance(data, list):
+                        samples.append({
+                            'line_number': line_num + 1,
+                            'data': data,
+                            'formatted': self._format_sample_for_display(data)
+                        })
                         
+                except json.JSONDecodeError:
+                    continue
+                    
+            self._preview_cache[cache_key] = copy.deepcopy(samples)
+            if len(self._preview_cache) > VALIDATION_CACHE_SIZE:
+                self._preview_cache.popitem(last=False)
+                
             return samples
             
         except Exception as e:
@@ -208,19 +620,11 @@ class FileManager:
         Returns:
             Formatted string
         """
-        formatted_parts = []
-        
-        for item in data:
-            role = item.get('role', 'unknown')
-            content = item.get('content', '')
-            
-            # Truncate long content
-            if len(content) > 100:
-                content = content[:97] + "..."
-                
-            formatted_parts.append(f"{role.upper()}: {content}")
-            
-        return " → ".join(formatted_parts)
+        # Content longer than 100 characters is truncated
+        return " → ".join(
+            f"{role.upper()}: {content if len(content) <= 100 else content[:97] + '...'}"
+            for role, content in map(_display_role_content, data)
+        )
         
     def update_gitignore(self, project_root: str, toolkit_dir: str):
         """
@@ -243,19 +647,41 @@ class FileManager:
                 # If not relative to project, use absolute pattern
                 ignore_pattern = str(toolkit_path) + "/"
                 
+            # Skip all IO when this file version is already known to ignore the toolkit
+            check_key = (ignore_pattern, toolkit_path.name)
+            cached = self._gitignore_state.get(str(gitignore_path))
+            try:
+                st = gitignore_path.stat()
+                signature = (st.st_mtime_ns, st.st_size)
+            except FileNotFoundError:
+                signature = None
+                
+            if cached and signature is not None and cached['signature'] == signature and check_key in cached['present']:
+                self.logger.info("Toolkit directory already in .gitignore")
+                return
+                
             # Read existing .gitignore
             existing_lines = []
-            if gitignore_path.exists():
-                with open(gitignore_path, 'r') as f:
-                    existing_lines = [line.rstrip() for line in f.readlines()]
+            digest = None
+            if signature is not None:
+                content = gitignore_path.read_bytes()
+                digest = hashlib.blake2b(content, digest_size=8).hexdigest()
+                
+                # Touched but unchanged since we last checked it
+                if cached and cached['digest'] == digest and check_key in cached['present']:
+                    cached['signature'] = signature
+                    self.logger.info("Toolkit directory already in .gitignore")
+                    return
                     
-            # Check if pattern already exists
-            pattern_exists = any(
-                line.strip() == ignore_pattern.strip() or 
-                line.strip() == toolkit_path.name + "/" or
-                line.strip().endswith("adapter_training_toolkit*/")
-                for line in existing_lines
+                existing_lines = [line.rstrip() for line in content.decode().splitlines()]
+                
+            # Check if pattern already exists (exact entry, directory name, or glob entry)
+            existing_pattern = re.compile(
+                rf"\s*(?:{re.escape(ignore_pattern.strip())}"
+                rf"|{re.escape(toolkit_path.name + '/')}"
+                rf"|.*adapter_training_toolkit\*/)\s*"
             )
+            pattern_exists = any(existing_pattern.fullmatch(line) for line in existing_lines)
             
             if not pattern_exists:
                 # Add our pattern
@@ -267,14 +693,29 @@ class FileManager:
                     ignore_pattern,
                 ])
                 
-                # Write updated .gitignore
-                with open(gitignore_path, 'w') as f:
-                    f.write("\n".join(existing_lines) + "\n")
-                    
+                # Write updated .gitignore, hashing what we write
+                hasher = hashlib.blake2b(digest_size=8)
+                with open(gitignore_path, 'wb') as f:
+                    for line in existing_lines:
+                        encoded = line.encode() + b"\n"
+                        hasher.update(encoded)
+                        f.write(encoded)
+                        
+                st = gitignore_path.stat()
+                signature = (st.st_mtime_ns, st.st_size)
+                digest = hasher.hexdigest()
                 self.logger.info(f"Updated .gitignore to exclude {ignore_pattern}")
             else:
                 self.logger.info("Toolkit directory already in .gitignore")
                 
+            present = cached['present'] if cached and cached['digest'] == digest else set()
+            present.add(check_key)
+            self._gitignore_state[str(gitignore_path)] = {
+                'signature': signature,
+                'digest': digest,
+                'present': present
+            }
+            
         except Exception as e:
             self.logger.error(f"Error updating .gitignore: {e}")
             
@@ -321,19 +762,20 @@ class FileManager:
             if not output_path.exists():
                 return True
                 
-            for item in output_path.iterdir():
-                if item.is_file():
-                    if keep_exports and item.suffix == ".fmadapter":
+            # DirEntry caches the file type from the directory scan
+            with os.scandir(output_path) as it:
+                for entry in it:
+                    name = entry.name
+                    if keep_exports and name.endswith(".fmadapter"):
                         continue
-                    if item.name.endswith(('.pt', '.log')):
-                        item.unlink()
-                elif item.is_dir():
-                    if keep_exports and item.suffix == ".fmadapter":
-                        continue
-                    if item.name in ['checkpoints', 'logs']:
-                        shutil.rmtree(item)
-                        item.mkdir()
-                        
+                    if entry.is_file(follow_symlinks=False):
+                        if name.endswith(('.pt', '.log')):
+                            os.unlink(entry.path)
+                    elif entry.is_dir(follow_symlinks=False):
+                        if name in ('checkpoints', 'logs'):
+                            shutil.rmtree(entry.path)
+                            os.mkdir(entry.path)
+                            
             self.logger.info(f"Cleaned output directory {output_path}")
             return True
             
@@ -351,15 +793,38 @@ class FileManager:
         Returns:
             Size in bytes
         """
+        # GNU du walks the tree in C outside the GIL; BSD/macOS du has no -b
+        if sys.platform.startswith('linux'):
+            try:
+                result = subprocess.run(
+                    ['du', '-sb', str(directory)],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                    timeout=DU_TIMEOUT_SECONDS
+                )
+                return int(result.stdout.split()[0])
+            except (OSError, ValueError, IndexError, subprocess.SubprocessError):
+                pass
+                
         try:
             total_size = 0
-            for dirpath, dirnames, filenames in os.walk(directory):
-                for filename in filenames:
-                    filepath = os.path.join(dirpath, filename)
-                    try:
-                        total_size += os.path.getsize(filepath)
-                    except OSError:
-                        continue
+            stack = [directory]
+            while stack:
+                try:
+                    it = os.scandir(stack.pop())
+                except OSError:
+                    continue
+                with it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            else:
+                                # DirEntry caches stat results, avoiding a second syscall
+                                total_size += entry.stat(follow_symlinks=False).st_size
+                        except OSError:
+                            continue
             return total_size
         except Exception:
             return 0
@@ -376,13 +841,11 @@ class FileManager:
         """
         if size_bytes < 1024:
             return f"{size_bytes} B"
-        elif size_bytes < 1024**2:
-            return f"{size_bytes/1024:.1f} KB"
-        elif size_bytes < 1024**3:
-            return f"{size_bytes/(1024**2):.1f} MB"
-        else:
-            return f"{size_bytes/(1024**3):.1f} GB"
             
+        # Each unit is 2**10 of the previous one
+        exp = min(3, (size_bytes.bit_length() - 1) // 10)
+        return f"{size_bytes / _SIZE_SCALES[exp]:.1f} {_SIZE_UNITS[exp]}"
+        
     def backup_config(self, config: Dict[str, Any], backup_dir: str) -> bool:
         """
         Backup training configuration.
@@ -403,8 +866,15 @@ class FileManager:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_file = backup_path / f"config_backup_{timestamp}.json"
             
-            with open(backup_file, 'w') as f:
-                json.dump(config, f, indent=2, default=str)
+            if ORJSON_AVAILABLE:
+                backup_file.write_bytes(orjson.dumps(
+                    config,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+                    default=str
+                ))
+            else:
+                with open(backup_file, 'w') as f:
+                    json.dump(config, f, indent=2, default=str)
                 
             self.logger.info(f"Configuration backed up to {backup_file}")
             return True
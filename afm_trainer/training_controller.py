@@ -8,16 +8,100 @@ import threading
 import time
 import re
 import os
-import sys
+import shlex
+import selectors
 from pathlib import Path
 from typing import Callable, Optional, Dict, Any
 import logging
 import queue
-import signal
 
-# Defer WandB import to avoid startup penalty
+# Defer WandB and error handler imports to avoid startup penalty
 # from .wandb_integration import WandBIntegration
-from .error_handler import get_error_handler
+# from .error_handler import get_error_handler
+
+
+# Size of each raw read from the training process output pipe
+OUTPUT_READ_CHUNK_SIZE = 65536
+
+# Pipes can only be multiplexed with selectors on POSIX; elsewhere stderr is
+# merged into stdout and read as a single stream
+SEPARATE_STDERR = os.name == 'posix'
+STDERR_LINE_PREFIX = b'[stderr] '
+
+# How long the monitors wait for output before re-checking for a stop request
+OUTPUT_POLL_TIMEOUT = 0.25
+
+# Maximum number of output lines forwarded to the log callback at once
+LOG_BATCH_MAX_LINES = 32
+
+# Progress updates are throttled to ~20 Hz unless progress moved noticeably
+PROGRESS_MIN_INTERVAL = 0.05
+PROGRESS_MIN_DELTA = 0.005
+
+# Patterns to extract progress information from training output
+_EPOCH_RE = re.compile(rb'Epoch (\d+)/(\d+)')
+
+# Batch and loss fields; each field is searched over the whole line so one
+# match never hides another. Patterns work on raw output bytes so lines are
+# only decoded for the log.
+_BATCH_RE = re.compile(rb'Training.*?(\d+)/(\d+)')
+_LOSS_RE = re.compile(rb'(?i:loss)[=:]?\s*([0-9.]+)')
+
+# Adapter checkpoints are named adapter-<epoch>.pt, plus adapter-final.pt
+_CHECKPOINT_NUMBER_RE = re.compile(r'adapter-(\d+)\.pt')
+
+# Optional compiled line parser (build with: cythonize -i afm_trainer/_line_parser.pyx)
+try:
+    from ._line_parser import parse_progress_line
+    COMPILED_LINE_PARSER_AVAILABLE = True
+except ImportError:
+    COMPILED_LINE_PARSER_AVAILABLE = False
+
+
+def _parse_progress_line(line: bytes) -> tuple:
+    """Return the first (epoch, total_epochs, batch, total_batches, loss) fields, as bytes or None."""
+    epoch = total_epochs = batch = total_batches = loss = None
+    # Substring checks skip the regex engine on lines without the field
+    if b'Epoch ' in line:
+        match = _EPOCH_RE.search(line)
+        if match:
+            epoch, total_epochs = match.groups()
+    if b'Training' in line:
+        match = _BATCH_RE.search(line)
+        if match:
+            batch, total_batches = match.groups()
+    match = _LOSS_RE.search(line)
+    if match:
+        loss = match.group(1)
+    return epoch, total_epochs, batch, total_batches, loss
+
+
+if not COMPILED_LINE_PARSER_AVAILABLE:
+    parse_progress_line = _parse_progress_line
+
+
+def _progress_terms(current_epoch: int, total_epochs: int, total_batches: int) -> tuple[float, float]:
+    """Return (epoch_base, batch_step) so progress = epoch_base + batch * batch_step."""
+    inv_total_epochs = 1.0 / total_epochs
+    epoch_base = (current_epoch - 1) * inv_total_epochs
+    batch_step = inv_total_epochs / total_batches if total_batches > 0 else 0.0
+    return epoch_base, batch_step
+
+
+def _checkpoint_sort_key(path: Path) -> tuple[int, int, float]:
+    """
+    Rank adapter checkpoints: final first, then by epoch number, then by mtime.
+    
+    Returns:
+        tuple: (tier, epoch, mtime); only the field for the path's tier is set
+    """
+    if path.name == "adapter-final.pt":
+        return (2, 0, 0.0)
+    match = _CHECKPOINT_NUMBER_RE.fullmatch(path.name)
+    if match:
+        return (1, int(match.group(1)), 0.0)
+    # Only unrecognised names need a stat() call
+    return (0, 0, path.stat().st_mtime)
 
 
 class TrainingController:
@@ -28,9 +112,16 @@ class TrainingController:
         self.process: Optional[subprocess.Popen] = None
         self.training_thread: Optional[threading.Thread] = None
         self.stop_event = threading.Event()
-        self.output_queue = queue.Queue()
         self.wandb_integration = None  # Lazy load when needed
-        self.error_handler = get_error_handler()
+        self._error_handler = None  # Lazy load when needed
+        
+    @property
+    def error_handler(self):
+        """Lazy load the shared error handler to avoid startup penalty."""
+        if self._error_handler is None:
+            from .error_handler import get_error_handler
+            self._error_handler = get_error_handler()
+        return self._error_handler
         
     def _get_wandb_integration(self):
         """Lazy load WandB integration to avoid startup penalty."""
@@ -68,52 +159,41 @@ class TrainingController:
         try:
             self.stop_event.clear()
             
-            # Create output directory
+            # Read configuration once up front
             output_dir = Path(config['output_dir'])
+            train_draft = config.get('train_draft', False)
+            
+            # Create output directory
             output_dir.mkdir(parents=True, exist_ok=True)
             
             # Build training command
             train_cmd = self._build_training_command(config)
-            log_callback(f"Training command: {' '.join(train_cmd)}")
+            log_callback(f"Training command: {shlex.join(train_cmd)}")
             
             # Start training process
-            self.process = subprocess.Popen(
-                train_cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True,
-                bufsize=1,
-                cwd=Path.cwd()  # Run from AFM Trainer directory
-            )
+            self.process = self._start_process(train_cmd)
             
             # Monitor training output
-            # Check if draft model training is enabled
-            train_draft = config.get('train_draft', False)
-            
-            # Adjust progress scaling based on whether draft training is enabled
-            def main_progress_callback(progress, message):
-                if train_draft:
-                    # Main training is only 50% of total when draft is enabled
-                    progress_callback(progress * 0.5, message)
-                else:
-                    progress_callback(progress, message)
-            
+            # Main training is only 50% of total when draft is enabled
             success = self._monitor_training_output(
                 self.process, 
-                main_progress_callback, 
+                progress_callback, 
                 log_callback,
-                config
+                config,
+                progress_scale=(0.0, 0.5) if train_draft else (0.0, 1.0)
             )
             
             # Train draft model if requested
-            if success and train_draft:
+            if success and train_draft and not self.stop_event.is_set():
                 log_callback("Starting draft model training...")
                 
-                def draft_progress_callback(progress, message):
-                    # Draft training is the second 50% of total progress
-                    progress_callback(0.5 + (progress * 0.5), f"Draft: {message}")
-                    
-                draft_success = self._train_draft_model(config, draft_progress_callback, log_callback)
+                # Draft training is the second 50% of total progress
+                draft_success = self._train_draft_model(
+                    config,
+                    progress_callback,
+                    log_callback,
+                    progress_scale=(0.5, 0.5)
+                )
                 success = success and draft_success
             
             return success
@@ -144,6 +224,24 @@ class TrainingController:
             except Exception as e:
                 self.logger.error(f"Error stopping training: {e}")
                 
+    def _start_process(self, cmd: list[str]) -> subprocess.Popen:
+        """
+        Start a training subprocess with its output piped for monitoring.
+        
+        Args:
+            cmd: Command arguments
+            
+        Returns:
+            The started process
+        """
+        return subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE if SEPARATE_STDERR else subprocess.STDOUT,
+            bufsize=0,  # Output is read straight from the pipe fd
+            cwd=Path.cwd()  # Run from AFM Trainer directory
+        )
+        
     def _build_training_command(self, config: Dict[str, Any]) -> list[str]:
         """
         Build the training command from configuration.
@@ -186,8 +284,9 @@ subprocess.run([sys.executable, '-m', 'examples.train_adapter'] + sys.argv[1:])
         ])
         
         # Add evaluation data if provided
-        if config.get('eval_data'):
-            cmd.extend(["--eval-data", config['eval_data']])
+        eval_data = config.get('eval_data')
+        if eval_data:
+            cmd.extend(["--eval-data", eval_data])
             
         # Add boolean flags
         if config.get('activation_checkpointing', False):
@@ -203,17 +302,123 @@ subprocess.run([sys.executable, '-m', 'examples.train_adapter'] + sys.argv[1:])
             cmd.append("--pack-sequences")
             
         # Add max sequence length if provided
-        if config.get('max_sequence_length'):
-            cmd.extend(["--max-sequence-length", str(config['max_sequence_length'])])
+        max_sequence_length = config.get('max_sequence_length')
+        if max_sequence_length:
+            cmd.extend(["--max-sequence-length", str(max_sequence_length)])
             
         return cmd
         
+    def _iter_output_blocks(self, process: subprocess.Popen):
+        """
+        Yield output line blocks from a process without blocking on its pipes.
+        
+        A daemon reader thread drains the pipes via _read_output_blocks and
+        hands each block over through a queue. The queue is polled with a
+        timeout, and an empty block is yielded whenever nothing arrived in
+        OUTPUT_POLL_TIMEOUT seconds, so callers get a chance to check the stop
+        event even while the child is silent or hung. Lines in a block can be
+        forwarded together before waiting for the next one.
+        
+        Args:
+            process: Subprocess with binary stdout (and optionally stderr) pipes
+            
+        Yields:
+            list[bytes]: Output lines without line terminators
+        """
+        blocks = queue.Queue()
+        
+        def reader():
+            try:
+                for block in self._read_output_blocks(process):
+                    blocks.put(block)
+            except Exception as e:
+                blocks.put(e)
+            finally:
+                blocks.put(None)
+                
+        threading.Thread(target=reader, name="training-output-reader", daemon=True).start()
+        
+        while True:
+            try:
+                block = blocks.get(timeout=OUTPUT_POLL_TIMEOUT)
+            except queue.Empty:
+                yield []
+                continue
+            if block is None:
+                return
+            if isinstance(block, Exception):
+                raise block
+            yield block
+            
+    def _read_output_blocks(self, process: subprocess.Popen):
+        """
+        Yield raw output lines from a process, one list per block read.
+        
+        Reads the pipes in large chunks and splits completed lines out of
+        per-stream accumulator buffers instead of issuing one read per line.
+        When stderr is piped separately both streams are drained as they
+        become ready, so neither can fill up and stall the child, and stderr
+        lines are tagged with STDERR_LINE_PREFIX. Carriage returns are
+        treated as line breaks so progress bar redraws still arrive as
+        separate lines. Each yielded list holds the lines completed by one
+        round of reads. Lines are left undecoded; callers decode only what
+        they forward to the log. This blocks on the pipes and runs on the
+        reader thread started by _iter_output_blocks.
+        
+        Args:
+            process: Subprocess with binary stdout (and optionally stderr) pipes
+            
+        Yields:
+            list[bytes]: Output lines without line terminators
+        """
+        if process.stderr is None:
+            # Single merged stream; plain blocking reads (no selector needed)
+            fd = process.stdout.fileno()
+            buf = b''
+            while True:
+                data = os.read(fd, OUTPUT_READ_CHUNK_SIZE)
+                if not data:
+                    break
+                *lines, buf = (buf + data.replace(b'\r', b'\n')).split(b'\n')
+                if lines:
+                    yield lines
+            if buf:
+                yield [buf]
+            return
+            
+        buffers = {}
+        with selectors.DefaultSelector() as selector:
+            selector.register(process.stdout.fileno(), selectors.EVENT_READ, b'')
+            selector.register(process.stderr.fileno(), selectors.EVENT_READ, STDERR_LINE_PREFIX)
+            
+            while selector.get_map():
+                block = []
+                for key, _ in selector.select():
+                    fd, prefix = key.fd, key.data
+                    data = os.read(fd, OUTPUT_READ_CHUNK_SIZE)
+                    if not data:
+                        # Stream closed; flush its unterminated tail
+                        selector.unregister(fd)
+                        tail = buffers.pop(fd, b'')
+                        if tail and not tail.isspace():
+                            block.append(prefix + tail)
+                        continue
+                        
+                    *lines, buffers[fd] = (buffers.get(fd, b'') + data.replace(b'\r', b'\n')).split(b'\n')
+                    if prefix:
+                        lines = [prefix + line for line in lines if line and not line.isspace()]
+                    block.extend(lines)
+                    
+                if block:
+                    yield block
+                    
     def _monitor_training_output(
         self, 
         process: subprocess.Popen,
         progress_callback: Callable[[float, str], None],
         log_callback: Callable[[str], None],
-        config: Dict[str, Any]
+        config: Dict[str, Any],
+        progress_scale: tuple[float, float] = (0.0, 1.0)
     ) -> bool:
         """
         Monitor training process output and extract progress information.
@@ -223,73 +428,107 @@ subprocess.run([sys.executable, '-m', 'examples.train_adapter'] + sys.argv[1:])
             progress_callback: Progress update callback
             log_callback: Log message callback
             config: Training configuration
+            progress_scale: (offset, scale) mapping this run onto overall progress
             
         Returns:
             bool: True if training completed successfully
         """
         try:
+            progress_offset, progress_factor = progress_scale
             current_epoch = 0
             total_epochs = config.get('epochs', 2)
             current_batch = 0
             total_batches = 0
-            
-            # Patterns to extract information from training output
-            epoch_pattern = re.compile(r'Epoch (\d+)/(\d+)')
-            batch_pattern = re.compile(r'Training.*?(\d+)/(\d+)')
-            loss_pattern = re.compile(r'loss[=:]?\s*([0-9.]+)', re.IGNORECASE)
-            
-            for line in iter(process.stdout.readline, ''):
+            last_progress_time = 0.0
+            last_progress = -1.0
+            last_state = None
+            
+            # Division terms and message labels only change with the epoch or
+            # totals, so they are recomputed then rather than for every line
+            if total_epochs > 0:
+                epoch_base, batch_step = _progress_terms(current_epoch, total_epochs, total_batches)
+                epoch_label = f"Epoch {current_epoch}/{total_epochs}"
+                batch_total_label = f"/{total_batches}"
+            
+            for lines in self._iter_output_blocks(process):
                 if self.stop_event.is_set():
                     return False
                     
-                line = line.strip()
-                if not line:
-                    continue
-                    
-                log_callback(line)
-                
-                # Extract epoch information
-                epoch_match = epoch_pattern.search(line)
-                if epoch_match:
-                    current_epoch = int(epoch_match.group(1))
-                    total_epochs = int(epoch_match.group(2))
-                    
-                # Extract batch information
-                batch_match = batch_pattern.search(line)
-                if batch_match:
-                    current_batch = int(batch_match.group(1))
-                    total_batches = int(batch_match.group(2))
-                    
-                # Calculate progress
-                if total_epochs > 0:
-                    epoch_progress = (current_epoch - 1) / total_epochs
-                    if total_batches > 0:
-                        batch_progress = current_batch / total_batches / total_epochs
-                        progress = epoch_progress + batch_progress
-                    else:
-                        progress = epoch_progress
+                # Forward output to the log in batches rather than per line
+                pending = []
+                for line in lines:
+                    # Lines arrive without terminators; keep indentation intact
+                    if not line or line.isspace():
+                        continue
                         
-                    progress = min(progress, 1.0)
+                    pending.append(line)
+                    if len(pending) >= LOG_BATCH_MAX_LINES:
+                        log_callback(b'\n'.join(pending).decode('utf-8', errors='replace'))
+                        pending.clear()
                     
-                    # Create progress message
-                    if current_batch > 0 and total_batches > 0:
-                        message = f"Epoch {current_epoch}/{total_epochs}, Batch {current_batch}/{total_batches}"
-                    else:
-                        message = f"Epoch {current_epoch}/{total_epochs}"
+                    # Most output carries no progress fields; a substring check
+                    # is far cheaper than running the pattern on every line
+                    if (b'Epoch' not in line and b'Training' not in line
+                            and b'oss' not in line and b'OSS' not in line):
+                        continue
+                        
+                    # Extract epoch, batch and loss information, keeping the
+                    # first occurrence of each field
+                    epoch, epochs, batch, batches, loss_text = parse_progress_line(line)
+                    terms_changed = False
+                    if epoch is not None:
+                        epoch, epochs = int(epoch), int(epochs)
+                        if epoch != current_epoch or epochs != total_epochs:
+                            current_epoch, total_epochs = epoch, epochs
+                            terms_changed = True
+                    if batch is not None:
+                        current_batch = int(batch)
+                        batches = int(batches)
+                        if batches != total_batches:
+                            total_batches = batches
+                            terms_changed = True
+                            
+                    if terms_changed and total_epochs > 0:
+                        epoch_base, batch_step = _progress_terms(current_epoch, total_epochs, total_batches)
+                        epoch_label = f"Epoch {current_epoch}/{total_epochs}"
+                        batch_total_label = f"/{total_batches}"
                         
-                    # Extract loss if available
-                    loss_match = loss_pattern.search(line)
-                    if loss_match:
-                        loss_value = float(loss_match.group(1))
-                        message += f", Loss: {loss_value:.4f}"
+                    # Calculate progress
+                    if total_epochs > 0:
+                        # Nothing to report if the displayed state is unchanged
+                        state = (current_epoch, total_epochs, current_batch, total_batches, loss_text)
+                        if state == last_state:
+                            continue
+                            
+                        progress = min(epoch_base + current_batch * batch_step, 1.0)
+                        now = time.monotonic()
+                        if (now - last_progress_time <= PROGRESS_MIN_INTERVAL
+                                and abs(progress - last_progress) <= PROGRESS_MIN_DELTA):
+                            continue
+                            
+                        # Create progress message from the preformatted labels
+                        if current_batch > 0 and total_batches > 0:
+                            message = epoch_label + ", Batch " + str(current_batch) + batch_total_label
+                        else:
+                            message = epoch_label
+                            
+                        # Add loss if available
+                        if loss_text is not None:
+                            message = "%s, Loss: %.4f" % (message, float(loss_text))
+                            
+                        progress_callback(progress_offset + progress * progress_factor, message)
+                        last_progress_time = now
+                        last_progress = progress
+                        last_state = state
                         
-                    progress_callback(progress, message)
+                if pending:
+                    log_callback(b'\n'.join(pending).decode('utf-8', errors='replace'))
                     
             # Wait for process to complete
             return_code = process.wait()
             
             if return_code == 0:
-                progress_callback(1.0, "Training completed successfully")
+                progress_callback(progress_offset + progress_factor, "Training completed successfully")
                 return True
             else:
                 log_callback(f"Training process exited with code {return_code}")
@@ -304,7 +543,8 @@ subprocess.run([sys.executable, '-m', 'examples.train_adapter'] + sys.argv[1:])
         self,
         config: Dict[str, Any],
         progress_callback: Callable[[float, str], None],
-        log_callback: Callable[[str], None]
+        log_callback: Callable[[str], None],
+        progress_scale: tuple[float, float] = (0.0, 1.0)
     ) -> bool:
         """
         Train the draft model for speculative decoding.
@@ -313,11 +553,14 @@ subprocess.run([sys.executable, '-m', 'examples.train_adapter'] + sys.argv[1:])
             config: Training configuration
             progress_callback: Progress update callback
             log_callback: Log message callback
+            progress_scale: (offset, scale) mapping this run onto overall progress
             
         Returns:
             bool: True if draft training completed successfully
         """
         try:
+            progress_offset, progress_factor = progress_scale
+            
             # Find the latest adapter checkpoint
             output_dir = Path(config['output_dir'])
             adapter_checkpoints = list(output_dir.glob("adapter-*.pt"))
@@ -327,7 +570,7 @@ subprocess.run([sys.executable, '-m', 'examples.train_adapter'] + sys.argv[1:])
                 return False
                 
             # Use the final checkpoint
-            latest_checkpoint = max(adapter_checkpoints, key=lambda x: x.stat().st_mtime)
+            latest_checkpoint = max(adapter_checkpoints, key=_checkpoint_sort_key)
             log_callback(f"Using adapter checkpoint: {latest_checkpoint}")
             
             # Build draft training command
@@ -353,45 +596,53 @@ subprocess.run([sys.executable, '-m', 'examples.train_draft_model'] + sys.argv[1
             ]
             
             # Add evaluation data if provided
-            if config.get('eval_data'):
-                draft_cmd.extend(["--eval-data", config['eval_data']])
+            eval_data = config.get('eval_data')
+            if eval_data:
+                draft_cmd.extend(["--eval-data", eval_data])
                 
-            log_callback(f"Draft training command: {' '.join(draft_cmd)}")
-            
-            # Start draft training process
-            draft_process = subprocess.Popen(
-                draft_cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True,
-                bufsize=1,
-                cwd=Path.cwd()
-            )
+            log_callback(f"Draft training command: {shlex.join(draft_cmd)}")
+            
+            # Start draft training process; tracking it as the current process
+            # lets stop_training() terminate it like the main run
+            draft_process = self._start_process(draft_cmd)
+            self.process = draft_process
             
             # Monitor draft training with progress tracking
-            progress_callback(0.0, "Draft training starting...")
+            progress_callback(progress_offset, "Draft training starting...")
             
-            for line in iter(draft_process.stdout.readline, ''):
+            for lines in self._iter_output_blocks(draft_process):
                 if self.stop_event.is_set():
                     draft_process.terminate()
                     return False
                     
-                line = line.strip()
-                if line:
-                    log_callback(f"[Draft] {line}")
-                    
+                pending = []
+                for line in lines:
+                    if not line or line.isspace():
+                        continue
+                        
+                    pending.append(b"[Draft] " + line)
+                    if len(pending) >= LOG_BATCH_MAX_LINES:
+                        log_callback(b'\n'.join(pending).decode('utf-8', errors='replace'))
+                        pending.clear()
+                        
                     # Extract progress from draft training output
-                    epoch_match = re.search(r'Epoch (\d+)/(\d+)', line)
+                    epoch_match = b'Epoch' in line and _EPOCH_RE.search(line)
                     if epoch_match:
                         current = int(epoch_match.group(1))
                         total = int(epoch_match.group(2))
                         progress = (current - 1) / total if total > 0 else 0.0
-                        progress_callback(progress, f"Draft: Epoch {current}/{total}")
+                        progress_callback(
+                            progress_offset + progress * progress_factor,
+                            f"Draft: Epoch {current}/{total}"
+                        )
+                        
+                if pending:
+                    log_callback(b'\n'.join(pending).decode('utf-8', errors='replace'))
                     
             return_code = draft_process.wait()
             
             if return_code == 0:
-                progress_callback(1.0, "Draft training completed successfully")
+                progress_callback(progress_offset + progress_factor, "Draft training completed successfully")
                 log_callback("Draft model training completed successfully")
                 return True
             else:
@@ -5,14 +5,15 @@ Provides optional Weights & Biases logging and monitoring for training runs.
 
 import os
 import sys
-import json
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 import logging
 import threading
 import time
 import re
-from dataclasses import asdict
+import queue
+import functools
+from datetime import datetime
 
 try:
     import wandb
@@ -21,18 +22,206 @@ except ImportError:
     WANDB_AVAILABLE = False
     wandb = None
 
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+    Observer = None
+    FileSystemEventHandler = object
+
+
+# Metrics are queued and shipped to WandB by a background flusher thread
+METRICS_QUEUE_SIZE = 10_000
+METRICS_FLUSH_INTERVAL = 0.2
+
+# Polling interval for log monitoring when file events are unavailable
+LOG_POLL_INTERVAL = 0.5
+
+
+@functools.lru_cache(maxsize=1)
+def _get_torch():
+    """Import torch on first use; None if it is not installed."""
+    try:
+        import torch
+        return torch
+    except ImportError:
+        return None
+
+
+def _noop(*args, **kwargs):
+    """Stand-in for logging methods while WandB is disabled."""
+    return None
+
+
+def _materialize_tensors(metrics: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Replace tensor values with Python scalars using a single device sync.
+    
+    Args:
+        metrics: Metrics that may hold torch tensors
+        
+    Returns:
+        dict: Copy of the metrics with tensors converted to scalars or arrays
+    """
+    metrics = dict(metrics)
+    
+    # Only callers that already imported torch can pass tensors
+    torch = sys.modules.get('torch')
+    if torch is None:
+        return metrics
+        
+    tensors = [(k, v) for k, v in metrics.items() if isinstance(v, torch.Tensor)]
+    if not tensors:
+        return metrics
+        
+    # Queue every device-to-host copy, then wait once instead of per item()
+    # Always copy so later in-place updates by the caller cannot leak into
+    # queued metrics
+    copies = [(k, v.detach().to('cpu', non_blocking=v.is_cuda, copy=True)) for k, v in tensors]
+    if any(v.is_cuda for _, v in tensors):
+        torch.cuda.current_stream().synchronize()
+        
+    # Larger tensors go to WandB as arrays sharing the host copy's memory;
+    # NumPy has no bfloat16, so those are widened first
+    for k, v in copies:
+        if v.numel() == 1:
+            metrics[k] = v.item()
+        else:
+            metrics[k] = (v.float() if v.dtype == torch.bfloat16 else v).numpy()
+    return metrics
+
+
+@functools.lru_cache(maxsize=1)
+def _get_psutil():
+    """Import psutil on first use; None if it is not installed."""
+    try:
+        import psutil
+        return psutil
+    except ImportError:
+        return None
+
+
+@functools.lru_cache(maxsize=1)
+def _get_file_manager():
+    """Create the shared FileManager on first use."""
+    from .file_manager import FileManager
+    return FileManager()
+
+
+@functools.lru_cache(maxsize=1)
+def _wandb_logged_in_cached() -> bool:
+    """Check for WandB credentials; cached until cleared by finish()."""
+    try:
+        # Check for API key
+        api_key = os.environ.get('WANDB_API_KEY')
+        if api_key:
+            return True
+            
+        # Check for login file
+        wandb_dir = Path.home() / ".wandb"
+        if (wandb_dir / "settings").exists():
+            return True
+            
+        return False
+    except Exception:
+        return False
+
+
+class _LogFileChangeHandler(FileSystemEventHandler):
+    """Calls back when the monitored log file is modified."""
+    
+    def __init__(self, log_path: Path, on_change):
+        super().__init__()
+        self.log_path = os.path.abspath(log_path)
+        self.on_change = on_change
+        
+    def on_modified(self, event):
+        if not event.is_directory and os.path.abspath(event.src_path) == self.log_path:
+            self.on_change()
+
 
 class WandBIntegration:
     """Handles WandB integration for training monitoring."""
     
+    # One pattern per metric, each searched over the whole line so one match
+    # never hides another
+    _LOG_PATTERNS = (
+        ('loss', re.compile(r'loss[=:]?\s*([0-9.]+)', re.IGNORECASE)),
+        ('epoch', re.compile(r'Epoch (\d+)/(\d+)')),
+        ('batch', re.compile(r'(\d+)/(\d+)\s*\|')),
+        ('lr', re.compile(r'lr[=:]?\s*([0-9.e-]+)', re.IGNORECASE)),
+    )
+    
+    # Cheap test for text every _LOG_PATTERNS match needs, to skip other lines
+    _METRIC_HINT_PATTERN = re.compile(r'(?i:loss|lr)|Epoch|\d/\d')
+    
+    # Logging methods replaced by a no-op while WandB is disabled
+    _HOT_LOG_METHODS = ("log_metrics", "log_training_progress", "log_evaluation_metrics")
+    
+    # Tags applied to every run
+    _BASE_TAGS = ("afm-trainer", "lora", "apple-foundation-models")
+    
+    # Training and model parameters copied into the run config, with defaults
+    _CONFIG_DEFAULTS = {
+        "epochs": 2,
+        "learning_rate": 1e-4,
+        "batch_size": 4,
+        "warmup_epochs": 1,
+        "gradient_accumulation_steps": 1,
+        "weight_decay": 1e-2,
+        "precision": 'bf16-mixed',
+        "activation_checkpointing": False,
+        "compile_model": False,
+        "max_sequence_length": None,
+    }
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.run = None
-        self.enabled = False
+        self._set_enabled(False)
         self.project_name = "afm-trainer"
         self.monitoring_thread = None
         self.stop_monitoring = threading.Event()
+        self._log_observer = None
+        self._log_file = None
+        self.log_interval = 50  # Batches between training progress logs
+        self._progress_buf = {
+            "train/loss": 0.0,
+            "train/loss_avg": 0.0,
+            "train/epoch": 0,
+            "train/batch": 0,
+            "train/progress": 0.0
+        }
+        self._progress_total_batches = 0
+        self._progress_total_steps = 1
+        self._epochs = 1
+        self._window_loss_sum = 0.0
+        self._window_batches = 0
+        self._epoch_loss_sum = 0.0
+        self._epoch_batches = 0
+        self._metrics_queue = None
+        self._flusher_thread = None
+        self._flusher_stop = threading.Event()
+        
+    def _set_enabled(self, enabled: bool):
+        """
+        Enable or disable logging.
+        
+        While disabled, the per-step logging methods are shadowed by a
+        no-op on the instance so callers skip the enabled check entirely.
         
+        Args:
+            enabled: Whether metrics should be sent to WandB
+        """
+        self.enabled = enabled
+        for name in self._HOT_LOG_METHODS:
+            if enabled:
+                self.__dict__.pop(name, None)
+            else:
+                setattr(self, name, _noop)
+                
     def is_available(self) -> bool:
         """Check if WandB is available."""
         return WANDB_AVAILABLE
@@ -66,10 +255,15 @@ class WandBIntegration:
                 project=self.project_name,
                 name=run_name,
                 config=wandb_config,
-                tags=self._create_tags(config)
+                tags=self._create_tags(config),
+                settings=self._create_settings()
             )
             
-            self.enabled = True
+            self.log_interval = max(1, int(config.get('log_every_n_batches', self.log_interval)))
+            self._epochs = self.run.config.get('epochs', 1)
+            self._progress_total_batches = 0
+            self._set_enabled(True)
+            self._start_flusher()
             self.logger.info(f"WandB initialized: {self.run.url}")
             return True
             
@@ -77,23 +271,37 @@ class WandBIntegration:
             self.logger.error(f"Failed to initialize WandB: {e}")
             return False
             
+    def _create_settings(self):
+        """
+        Create WandB settings with background system metrics disabled.
+        
+        System information is logged once at training start, so WandB's
+        periodic stats sampling only adds stalls to the training loop.
+        
+        Returns:
+            wandb.Settings, or None to use WandB defaults
+        """
+        # Newer releases use the x_ prefix, older ones the _ prefix
+        for prefix in ("x_", "_"):
+            try:
+                return wandb.Settings(**{
+                    f"{prefix}disable_stats": True,
+                    f"{prefix}disable_meta": True
+                })
+            except Exception:
+                continue
+                
+        self.logger.debug("Could not disable WandB system metrics")
+        return None
+        
     def _is_logged_in(self) -> bool:
         """Check if user is logged in to WandB."""
-        try:
-            # Check for API key
-            api_key = os.environ.get('WANDB_API_KEY')
-            if api_key:
-                return True
-                
-            # Check for login file
-            wandb_dir = Path.home() / ".wandb"
-            if (wandb_dir / "settings").exists():
-                return True
-                
-            return False
-        except Exception:
-            return False
-            
+        logged_in = _wandb_logged_in_cached()
+        if not logged_in:
+            # Only a positive answer is kept, so a later login is picked up
+            _wandb_logged_in_cached.cache_clear()
+        return logged_in
+        
     def _create_wandb_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
         """
         Create WandB configuration from training config.
@@ -104,26 +312,14 @@ class WandBIntegration:
         Returns:
             WandB configuration dictionary
         """
-        wandb_config = {
-            # Training parameters
-            "epochs": config.get('epochs', 2),
-            "learning_rate": config.get('learning_rate', 1e-4),
-            "batch_size": config.get('batch_size', 4),
-            "warmup_epochs": config.get('warmup_epochs', 1),
-            "gradient_accumulation_steps": config.get('gradient_accumulation_steps', 1),
-            "weight_decay": config.get('weight_decay', 1e-2),
-            "precision": config.get('precision', 'bf16-mixed'),
-            
-            # Model parameters
-            "activation_checkpointing": config.get('activation_checkpointing', False),
-            "compile_model": config.get('compile_model', False),
-            "max_sequence_length": config.get('max_sequence_length'),
-            
-            # Dataset information
-            "train_data": Path(config.get('train_data', '')).name if config.get('train_data') else None,
-            "eval_data": Path(config.get('eval_data', '')).name if config.get('eval_data') else None,
-            "train_draft": config.get('train_draft', False),
-        }
+        get = config.get
+        wandb_config = {k: get(k, default) for k, default in self._CONFIG_DEFAULTS.items()}
+        
+        # Dataset information
+        train_data, eval_data = get('train_data'), get('eval_data')
+        wandb_config["train_data"] = Path(train_data).name if train_data else None
+        wandb_config["eval_data"] = Path(eval_data).name if eval_data else None
+        wandb_config["train_draft"] = get('train_draft', False)
         
         return wandb_config
         
@@ -137,18 +333,20 @@ class WandBIntegration:
         Returns:
             List of tags
         """
-        tags = ["afm-trainer", "lora", "apple-foundation-models"]
+        get = config.get
+        precision = get('precision')
+        tags = [*self._BASE_TAGS]
         
         # Add precision tag
-        if config.get('precision'):
-            tags.append(f"precision-{config['precision']}")
+        if precision:
+            tags.append(f"precision-{precision}")
             
         # Add draft model tag
-        if config.get('train_draft', False):
+        if get('train_draft', False):
             tags.append("draft-model")
             
         # Add activation checkpointing tag
-        if config.get('activation_checkpointing', False):
+        if get('activation_checkpointing', False):
             tags.append("activation-checkpointing")
             
         return tags
@@ -164,43 +362,133 @@ class WandBIntegration:
             return
             
         try:
-            # Log dataset statistics if available
+            # Collect everything into one payload so it is sent in a single call
+            all_metrics = {}
+            
+            # Dataset statistics if available
             train_stats = self._get_dataset_stats(config.get('train_data'))
             if train_stats:
-                wandb.log({"dataset/train_samples": train_stats.get('valid_samples', 0)})
-                wandb.log({"dataset/train_avg_tokens": train_stats.get('average_tokens_per_sample', 0)})
+                all_metrics["dataset/train_samples"] = train_stats.get('valid_samples', 0)
+                all_metrics["dataset/train_avg_tokens"] = train_stats.get('average_tokens_per_sample', 0)
                 
             eval_stats = self._get_dataset_stats(config.get('eval_data'))
             if eval_stats:
-                wandb.log({"dataset/eval_samples": eval_stats.get('valid_samples', 0)})
-                wandb.log({"dataset/eval_avg_tokens": eval_stats.get('average_tokens_per_sample', 0)})
+                all_metrics["dataset/eval_samples"] = eval_stats.get('valid_samples', 0)
+                all_metrics["dataset/eval_avg_tokens"] = eval_stats.get('average_tokens_per_sample', 0)
                 
-            # Log system information
-            self._log_system_info()
+            # System information
+            all_metrics.update(self._get_system_info())
             
+            # Left uncommitted so it shares the first metrics history row
+            if all_metrics:
+                self.log_metrics(all_metrics, commit=False)
+                
         except Exception as e:
             self.logger.error(f"Error logging training start: {e}")
             
-    def log_metrics(self, metrics: Dict[str, Any], step: Optional[int] = None):
+    def log_metrics(self, metrics: Dict[str, Any], step: Optional[int] = None,
+                    commit: Optional[bool] = None):
         """
         Log training metrics.
         
+        Metrics are copied onto a queue and sent by the flusher thread, so
+        callers never wait on WandB serialization. Tensor values are
+        converted to scalars first with a single device synchronization.
+        
         Args:
             metrics: Dictionary of metrics to log
             step: Optional step number
+            commit: False to hold the metrics for the next history row
         """
         if not self.enabled:
             return
             
         try:
-            wandb.log(metrics, step=step)
+            metrics = _materialize_tensors(metrics)
+            metrics_queue = self._metrics_queue
+            if metrics_queue is None:
+                wandb.log(metrics, step=step, commit=commit)
+                return
+            metrics_queue.put_nowait((step, metrics, commit))
+        except queue.Full:
+            self.logger.warning("WandB metrics queue full, dropping metrics")
         except Exception as e:
             self.logger.error(f"Error logging metrics: {e}")
             
+    def _start_flusher(self):
+        """Start the background thread that ships queued metrics to WandB."""
+        self._metrics_queue = queue.Queue(maxsize=METRICS_QUEUE_SIZE)
+        self._flusher_stop.clear()
+        self._flusher_thread = threading.Thread(
+            target=self._flush_metrics_loop,
+            args=(self._metrics_queue,)
+        )
+        self._flusher_thread.daemon = True
+        self._flusher_thread.start()
+        
+    def _stop_flusher(self):
+        """Send any queued metrics and stop the flusher thread."""
+        if self._flusher_thread is None:
+            return
+            
+        self._flusher_stop.set()
+        self._flusher_thread.join(timeout=5)
+        self._flusher_thread = None
+        self._metrics_queue = None
+        
+    def _flush_metrics_loop(self, metrics_queue: queue.Queue):
+        """
+        Periodically drain the metrics queue into WandB.
+        
+        Args:
+            metrics_queue: Queue of (step, metrics, commit) items
+        """
+        while True:
+            stopping = self._flusher_stop.wait(METRICS_FLUSH_INTERVAL)
+            self._flush_metrics(metrics_queue)
+            if stopping:
+                return
+                
+    def _flush_metrics(self, metrics_queue: queue.Queue):
+        """
+        Send all queued metrics, merging entries that share a history row.
+        
+        Args:
+            metrics_queue: Queue of (step, metrics, commit) items
+        """
+        batches = []
+        while True:
+            try:
+                step, metrics, commit = metrics_queue.get_nowait()
+            except queue.Empty:
+                break
+            # Entries without a step each advance WandB's step unless the
+            # previous one was uncommitted, so those and repeated explicit
+            # steps are merged
+            if batches:
+                last_step, last_metrics, last_commit = batches[-1]
+                if ((step is not None and last_step == step)
+                        or (last_commit is False and step is None)):
+                    last_metrics.update(metrics)
+                    batches[-1] = (last_step, last_metrics, commit)
+                    continue
+            batches.append((step, metrics, commit))
+            
+        for step, metrics, commit in batches:
+            try:
+                wandb.log(metrics, step=step, commit=commit)
+            except Exception as e:
+                self.logger.error(f"Error logging metrics: {e}")
+                
+
     def log_training_progress(self, epoch: int, batch: int, total_batches: int, loss: float):
         """
         Log training progress.
         
+        Losses are averaged over a window of log_interval batches and only
+        sent to WandB on every log_interval-th batch; flush_progress() sends
+        a partial window and flush_epoch() the aggregate for the epoch.
+        
         Args:
             epoch: Current epoch
             batch: Current batch
@@ -211,17 +499,58 @@ class WandBIntegration:
             return
             
         try:
-            step = epoch * total_batches + batch
-            metrics = {
-                "train/loss": loss,
-                "train/epoch": epoch,
-                "train/batch": batch,
-                "train/progress": (epoch * total_batches + batch) / (total_batches * self.run.config.get('epochs', 1))
-            }
-            self.log_metrics(metrics, step=step)
+            buf = self._progress_buf
+            if self._epoch_batches and buf["train/epoch"] != epoch:
+                self.flush_epoch()
+                
+            buf["train/loss"] = loss
+            buf["train/epoch"] = epoch
+            buf["train/batch"] = batch
+            if total_batches != self._progress_total_batches:
+                self._progress_total_batches = total_batches
+                self._progress_total_steps = total_batches * self._epochs
+            self._window_loss_sum += loss
+            self._window_batches += 1
+            self._epoch_loss_sum += loss
+            self._epoch_batches += 1
+            if batch % self.log_interval == 0:
+                self.flush_progress()
         except Exception as e:
             self.logger.error(f"Error logging training progress: {e}")
             
+    def flush_progress(self):
+        """Send the averaged training progress for the current window, if any."""
+        if not self._window_batches:
+            return
+            
+        # The buffer is reused; log_metrics copies it before queueing
+        buf = self._progress_buf
+        total_batches = self._progress_total_batches
+        step = buf["train/epoch"] * total_batches + buf["train/batch"]
+        buf["train/loss_avg"] = self._window_loss_sum / self._window_batches
+        buf["train/progress"] = step / self._progress_total_steps
+        self._window_loss_sum = 0.0
+        self._window_batches = 0
+        self.log_metrics(buf, step=step)
+        
+    def flush_epoch(self):
+        """Send the pending progress window and the loss aggregate for the epoch."""
+        self.flush_progress()
+        if not self._epoch_batches:
+            return
+            
+        epoch = self._progress_buf["train/epoch"]
+        epoch_metrics = {
+            "train/epoch_loss_avg": self._epoch_loss_sum / self._epoch_batches,
+            "train/epoch_batches": self._epoch_batches,
+            "train/epoch": epoch
+        }
+        self._epoch_loss_sum = 0.0
+        self._epoch_batches = 0
+        step = epoch * self._progress_total_batches + self._progress_buf["train/batch"]
+        self.log_metrics(epoch_metrics, step=step)
+        
+
     def log_evaluation_metrics(self, epoch: int, eval_loss: float):
         """
         Log evaluation metrics.
@@ -253,6 +582,8 @@ class WandBIntegration:
             return
             
         try:
+            self.flush_epoch()
+            
             # Log final metrics
             completion_metrics = {
                 "final/train_loss": final_metrics.get('train_loss'),
@@ -265,6 +596,7 @@ class WandBIntegration:
             completion_metrics = {k: v for k, v in completion_metrics.items() if v is not None}
             
             self.log_metrics(completion_metrics)
+            self._stop_flusher()
             
             # Mark run as finished
             if self.run:
@@ -284,11 +616,14 @@ class WandBIntegration:
             return
             
         try:
+            self.flush_epoch()
+            
             failure_metrics = {
                 "final/status": "failed",
                 "final/error": error_message
             }
             self.log_metrics(failure_metrics)
+            self._stop_flusher()
             
             if self.run:
                 self.run.finish(exit_code=1)
@@ -309,6 +644,19 @@ class WandBIntegration:
         if self.monitoring_thread and self.monitoring_thread.is_alive():
             return
             
+        if self._log_observer is not None:
+            return
+            
+        # With watchdog, new lines are read on the observer's own thread when
+        # the file changes, so no dedicated monitor thread is needed
+        if WATCHDOG_AVAILABLE and log_file and Path(log_file).exists():
+            try:
+                self._start_log_observer(Path(log_file))
+                return
+            except Exception as e:
+                self.logger.warning(f"File events unavailable, polling log instead: {e}")
+                self._stop_log_observer()
+                
         self.stop_monitoring.clear()
         self.monitoring_thread = threading.Thread(
             target=self._monitor_logs,
@@ -320,12 +668,56 @@ class WandBIntegration:
     def stop_log_monitoring(self):
         """Stop log monitoring."""
         self.stop_monitoring.set()
+        self._stop_log_observer()
         if self.monitoring_thread:
             self.monitoring_thread.join(timeout=5)
             
+    def _start_log_observer(self, log_path: Path):
+        """
+        Follow a log file through file system events.
+        
+        Args:
+            log_path: Log file to monitor
+        """
+        self._log_file = open(log_path, 'r')
+        self._log_file.seek(0, 2)  # Go to end of file
+        
+        self._log_observer = Observer()
+        self._log_observer.schedule(
+            _LogFileChangeHandler(log_path, self._read_new_log_lines),
+            str(log_path.parent.resolve())
+        )
+        self._log_observer.start()
+        
+    def _stop_log_observer(self):
+        """Stop following the log file through file system events."""
+        observer, self._log_observer = self._log_observer, None
+        if observer is not None:
+            observer.stop()
+            observer.join(timeout=5)
+            
+        log_file, self._log_file = self._log_file, None
+        if log_file is not None:
+            log_file.close()
+            
+    def _read_new_log_lines(self):
+        """Extract metrics from lines appended since the last read."""
+        try:
+            log_file = self._log_file
+            if log_file is None:
+                return
+                
+            for line in iter(log_file.readline, ''):
+                self._extract_metrics_from_line(line)
+                
+        except Exception as e:
+            self.logger.error(f"Error monitoring logs: {e}")
+            
     def _monitor_logs(self, log_file: Optional[str] = None):
         """
-        Monitor logs for automatic metric extraction.
+        Monitor logs for automatic metric extraction by polling.
+        
+        Used when file system events are unavailable.
         
         Args:
             log_file: Log file to monitor
@@ -336,14 +728,6 @@ class WandBIntegration:
         try:
             log_path = Path(log_file)
             
-            # Patterns for extracting metrics from logs
-            patterns = {
-                'loss': re.compile(r'loss[=:]?\s*([0-9.]+)', re.IGNORECASE),
-                'epoch': re.compile(r'Epoch (\d+)/(\d+)'),
-                'batch': re.compile(r'(\d+)/(\d+)\s*\|'),
-                'lr': re.compile(r'lr[=:]?\s*([0-9.e-]+)', re.IGNORECASE)
-            }
-            
             if log_path.exists():
                 with open(log_path, 'r') as f:
                     f.seek(0, 2)  # Go to end of file
@@ -351,40 +735,38 @@ class WandBIntegration:
                     while not self.stop_monitoring.is_set():
                         line = f.readline()
                         if line:
-                            self._extract_metrics_from_line(line, patterns)
+                            self._extract_metrics_from_line(line)
                         else:
-                            time.sleep(0.5)
+                            time.sleep(LOG_POLL_INTERVAL)
                             
         except Exception as e:
             self.logger.error(f"Error monitoring logs: {e}")
             
-    def _extract_metrics_from_line(self, line: str, patterns: Dict[str, re.Pattern]):
+    def _extract_metrics_from_line(self, line: str):
         """
         Extract metrics from a log line.
         
         Args:
             line: Log line
-            patterns: Regex patterns for extraction
         """
+        if not self._METRIC_HINT_PATTERN.search(line):
+            return
+            
         try:
             metrics = {}
             
-            for metric_name, pattern in patterns.items():
+            for metric_name, pattern in self._LOG_PATTERNS:
                 match = pattern.search(line)
                 if match:
                     if metric_name == 'epoch':
-                        current_epoch = int(match.group(1))
-                        total_epochs = int(match.group(2))
-                        metrics['train/current_epoch'] = current_epoch
-                        metrics['train/total_epochs'] = total_epochs
+                        metrics['train/current_epoch'] = int(match.group(1))
+                        metrics['train/total_epochs'] = int(match.group(2))
                     elif metric_name == 'batch':
-                        current_batch = int(match.group(1))
-                        total_batches = int(match.group(2))
-                        metrics['train/current_batch'] = current_batch
-                        metrics['train/total_batches'] = total_batches
+                        metrics['train/current_batch'] = int(match.group(1))
+                        metrics['train/total_batches'] = int(match.group(2))
                     else:
                         metrics[f'train/{metric_name}'] = float(match.group(1))
-                        
+                    
             if metrics:
                 self.log_metrics(metrics)
                 
@@ -405,29 +787,35 @@ class WandBIntegration:
             return None
             
         try:
-            from .file_manager import FileManager
-            file_manager = FileManager()
-            is_valid, _, stats = file_manager.validate_jsonl_file(dataset_path)
+            # The shared FileManager caches results for unchanged files
+            is_valid, _, stats = _get_file_manager().validate_jsonl_file(dataset_path)
             return stats if is_valid else None
         except Exception:
             return None
             
-    def _log_system_info(self):
-        """Log system information."""
+    def _get_system_info(self) -> Dict[str, Any]:
+        """
+        Collect system information.
+        
+        Returns:
+            System information metrics, empty if unavailable
+        """
         try:
             import platform
-            import psutil
             
             system_info = {
                 "system/platform": platform.platform(),
                 "system/python_version": platform.python_version(),
-                "system/cpu_count": psutil.cpu_count(),
-                "system/memory_total_gb": psutil.virtual_memory().total / (1024**3)
             }
             
+            psutil = _get_psutil()
+            if psutil is not None:
+                system_info["system/cpu_count"] = psutil.cpu_count()
+                system_info["system/memory_total_gb"] = psutil.virtual_memory().total / (1024**3)
+                
             # GPU information if available
-            try:
-                import torch
+            torch = _get_torch()
+            if torch is not None:
                 if torch.cuda.is_available():
                     system_info["system/cuda_available"] = True
                     system_info["system/cuda_device_count"] = torch.cuda.device_count()
@@ -440,13 +828,11 @@ class WandBIntegration:
                 else:
                     system_info["system/mps_available"] = False
                     
-            except ImportError:
-                pass
-                
-            self.log_metrics(system_info)
+            return system_info
             
         except Exception as e:
             self.logger.error(f"Error logging system info: {e}")
+            return {}
             
     def create_run_name(self, config: Dict[str, Any]) -> str:
         """
@@ -459,17 +845,14 @@ class WandBIntegration:
             Generated run name
         """
         try:
-            # Get adapter name or use default
-            adapter_name = config.get('adapter_name', 'adapter')
-            
-            # Get key parameters
-            epochs = config.get('epochs', 2)
-            lr = config.get('learning_rate', 1e-4)
-            batch_size = config.get('batch_size', 4)
-            precision = config.get('precision', 'bf16-mixed')
+            # Get adapter name and key parameters, with defaults
+            get = config.get
+            adapter_name, epochs, lr, batch_size, precision = (
+                get('adapter_name', 'adapter'), get('epochs', 2), get('learning_rate', 1e-4),
+                get('batch_size', 4), get('precision', 'bf16-mixed')
+            )
             
             # Create timestamp
-            from datetime import datetime
             timestamp = datetime.now().strftime("%m%d_%H%M")
             
             # Construct name
@@ -485,6 +868,10 @@ class WandBIntegration:
         try:
             self.stop_log_monitoring()
             
+            if self.enabled:
+                self.flush_epoch()
+            self._stop_flusher()
+            
             if self.run:
                 try:
                     self.run.finish()
@@ -494,7 +881,8 @@ class WandBIntegration:
                 finally:
                     self.run = None
                     
-            self.enabled = False
+            self._set_enabled(False)
+            _wandb_logged_in_cached.cache_clear()
             self.logger.info("WandB integration cleaned up")
             
         except Exception as e:
@@ -8,84 +8,114 @@ import os
 import sys
 import threading
 
-# Set X11 environment variables BEFORE any imports
-if sys.platform.startswith('linux'):
-    # Comprehensive X11 safety environment
-    os.environ.update({
-        'QT_X11_NO_MITSHM': '1',
-        'XLIB_SKIP_ARGB_VISUALS': '1', 
-        'XDG_SESSION_TYPE': 'x11',
-        'PYTHONUNBUFFERED': '1',
-        'LIBGL_ALWAYS_INDIRECT': '1',
-        'MESA_GL_VERSION_OVERRIDE': '1.4',
-        # Force single-threaded X11 operations
-        'LIBXCB_ALLOW_SLOPPY_LOCK': '1',
-        'XCB_DISABLE_SEQUENCE_CHECK': '1',
-        # Disable problematic GUI features
-        'QT_LOGGING_RULES': 'qt.qpa.xcb.warning=false',
-        'XLIB_SKIP_ARGB_VISUALS': '1'
-    })
+# Comprehensive X11 safety environment
+_X11_ENV = (
+    ('QT_X11_NO_MITSHM', '1'),
+    ('XLIB_SKIP_ARGB_VISUALS', '1'),
+    ('XDG_SESSION_TYPE', 'x11'),
+    ('PYTHONUNBUFFERED', '1'),
+    ('LIBGL_ALWAYS_INDIRECT', '1'),
+    ('MESA_GL_VERSION_OVERRIDE', '1.4'),
+    # Force single-threaded X11 operations
+    ('LIBXCB_ALLOW_SLOPPY_LOCK', '1'),
+    ('XCB_DISABLE_SEQUENCE_CHECK', '1'),
+    # Disable problematic GUI features
+    ('QT_LOGGING_RULES', 'qt.qpa.xcb.warning=false'),
+)
 
-    # Completely disable threading to prevent X11 conflicts
-    original_thread_init = threading.Thread.__init__
-    original_thread_start = threading.Thread.start
-    
-    def disabled_thread_init(self, *args, **kwargs):
-        """Disable thread creation in safe mode."""
-        print("Threading disabled for X11 safety")
-        pass
-        
-    def disabled_thread_start(self):
-        """Disable thread starting in safe mode."""
-        print("Thread start blocked for X11 safety")
-        pass
+# Only Linux needs an X11 or Wayland display to be announced
+HAS_DISPLAY = (not sys.platform.startswith('linux')
+               or bool(os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY')))
+
+
+def setup_x11():
+    """
+    Set X11 environment variables and initialize X11 threading.
     
-    # Comment out threading override for now - might be too aggressive
-    # threading.Thread.__init__ = disabled_thread_init
-    # threading.Thread.start = disabled_thread_start
+    Runs before the GUI is imported; kept out of module scope so processes
+    that import this module (such as spawned workers) skip it.
+    """
+    if sys.platform.startswith('linux'):
+        # Values already set by the user take precedence
+        for key, value in _X11_ENV:
+            os.environ.setdefault(key, value)
     
-    # Try X11 threading initialization with error handling
-    try:
-        import ctypes
-        import ctypes.util
+        # Completely disable threading to prevent X11 conflicts
+        original_thread_init = threading.Thread.__init__
+        original_thread_start = threading.Thread.start
         
-        x11_lib = ctypes.util.find_library('X11')
-        if x11_lib:
-            x11 = ctypes.cdll.LoadLibrary(x11_lib)
-            x11.XInitThreads()
+        def disabled_thread_init(self, *args, **kwargs):
+            """Disable thread creation in safe mode."""
+            print("Threading disabled for X11 safety")
+            pass
             
-            # Try to set X11 to single-threaded mode
+        def disabled_thread_start(self):
+            """Disable thread starting in safe mode."""
+            print("Thread start blocked for X11 safety")
+            pass
+        
+        # Comment out threading override for now - might be too aggressive
+        # threading.Thread.__init__ = disabled_thread_init
+        # threading.Thread.start = disabled_thread_start
+        
+        # Try X11 threading initialization with error handling; without a
+        # display there is no X server to initialize
+        if HAS_DISPLAY:
             try:
-                x11.XSetErrorHandler(None)  # Ignore X11 errors
-            except:
-                pass
+                import ctypes
+                import ctypes.util
                 
-    except Exception as e:
-        print(f"X11 setup warning: {e}")
+                x11_lib = ctypes.util.find_library('X11')
+                if x11_lib:
+                    x11 = ctypes.cdll.LoadLibrary(x11_lib)
+                    x11.XInitThreads()
+                    
+                    # Try to set X11 to single-threaded mode
+                    try:
+                        x11.XSetErrorHandler(None)  # Ignore X11 errors
+                    except:
+                        pass
+                        
+            except Exception as e:
+                print(f"X11 setup warning: {e}")
 
-# Import tkinter with error handling
-try:
-    import tkinter as tk
-    # Test tkinter creation in safe mode
-    root = tk.Tk()
-    root.withdraw()  # Hide the test window
-    root.destroy()
-    print("✓ Tkinter working in safe mode")
-except Exception as e:
-    print(f"✗ Tkinter error: {e}")
-    print("Trying to continue anyway...")
 
-# Now import and run the GUI
-if __name__ == "__main__":
+def check_tkinter():
+    """Check that a Tk window can be created in safe mode."""
+    if HAS_DISPLAY:
+        try:
+            import tkinter as tk
+            # Test tkinter creation in safe mode
+            root = tk.Tk()
+            root.withdraw()  # Hide the test window
+            root.destroy()
+            print("✓ Tkinter working in safe mode")
+        except Exception as e:
+            print(f"✗ Tkinter error: {e}")
+            print("Trying to continue anyway...")
+    else:
+        print("⚠ No DISPLAY or WAYLAND_DISPLAY set, skipping Tkinter check")
+
+
+def main():
+    """Set up X11 safety, then import and run the GUI."""
+    setup_x11()
+    check_tkinter()
+    
+    # Now import and run the GUI
     try:
         print("Loading AFM Trainer in Linux safe mode...")
-        from afm_trainer.afm_trainer_gui import main
+        from afm_trainer.afm_trainer_gui import main as run_gui
         print("Starting GUI...")
         print("Creating main window...")
-        main()
+        run_gui()
         print("GUI main() returned")
     except Exception as e:
         print(f"Error starting GUI: {e}")
         import traceback
         traceback.print_exc()
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,51 +8,15 @@ import sys
 import subprocess
 from pathlib import Path
 import os
+import re
 
+from afm_trainer._launcher import (
+    check_uv_installed, install_uv, check_toolkit_directory, setup_linux_environment,
+    find_working_python_linux, run_and_exit, uv_environment, venv_site_packages
+)
 
-def check_uv_installed():
-    """Check if UV is installed."""
-    try:
-        result = subprocess.run(['uv', '--version'], capture_output=True, text=True)
-        return result.returncode == 0
-    except FileNotFoundError:
-        return False
-
-
-def install_uv():
-    """Install UV package manager."""
-    print("UV not found. Installing UV...")
-    try:
-        # Install UV using the official installer
-        if sys.platform.startswith('win'):
-            # Windows
-            subprocess.run(['powershell', '-c', 'irm https://astral.sh/uv/install.ps1 | iex'], check=True)
-        else:
-            # macOS/Linux
-            subprocess.run(['curl', '-LsSf', 'https://astral.sh/uv/install.sh', '|', 'sh'], shell=True, check=True)
-        print("✓ UV installed successfully!")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"✗ Failed to install UV: {e}")
-        return False
-
-
-def check_toolkit_directory():
-    """Check if the Apple toolkit directory exists."""
-    possible_dirs = [
-        Path.cwd() / ".adapter_training_toolkit_v26_0_0",
-        Path.cwd() / "adapter_training_toolkit_v26_0_0",
-    ]
-    
-    # Also check for any directory matching the pattern
-    for pattern in [".adapter_training_toolkit_v*", "adapter_training_toolkit_v*"]:
-        possible_dirs.extend(Path.cwd().glob(pattern))
-    
-    for toolkit_dir in possible_dirs:
-        if toolkit_dir.exists() and (toolkit_dir / "examples").exists():
-            return toolkit_dir
-            
-    return None
+# X11 threading warnings filtered from the UV Python fallback's output
+XCB_NOISE_PATTERN = re.compile(r'\[xcb\]|python3: .*xcb')
 
 
 def install_dependencies():
@@ -60,9 +24,12 @@ def install_dependencies():
     print("\n📦 Installing dependencies with UV...")
     
     try:
+        # Prefer wheels from a local .wheelhouse when one exists
+        env = uv_environment()
+        
         # Install GUI wrapper dependencies (from pyproject.toml)
         print("  Installing AFM Trainer GUI dependencies...")
-        subprocess.run(['uv', 'sync'], cwd=Path(__file__).parent, check=True)
+        subprocess.run(['uv', 'sync'], cwd=Path(__file__).parent, env=env, check=True)
         print("  ✓ GUI dependencies installed")
         
         # Install Apple toolkit dependencies
@@ -84,14 +51,14 @@ def install_dependencies():
             if non_torch_reqs:
                 subprocess.run(
                     ['uv', 'add'] + non_torch_reqs,
-                    cwd=Path(__file__).parent, check=True
+                    cwd=Path(__file__).parent, env=env, check=True
                 )
 
             # Install default PyTorch for Metal support
             subprocess.run(
              #   ['uv', 'pip', 'install', 'torch', 'torchvision', 'torchaudio'],
                  ['uv', 'add', 'torch',  'torchvision', '--index', 'pytorch-mps'],
-                cwd=Path(__file__).parent, check=True
+                cwd=Path(__file__).parent, env=env, check=True
             )
             print("    ✓ PyTorch for Metal installed.")
         else:
@@ -99,7 +66,7 @@ def install_dependencies():
             print("    Detected Linux/Windows. Installing PyTorch for CUDA from requirements-toolkit.txt...")
             subprocess.run(
                 ['uv', 'add', '-r', 'requirements-toolkit.txt'],
-                cwd=Path(__file__).parent, check=True
+                cwd=Path(__file__).parent, env=env, check=True
             )
         
         print("  ✓ Toolkit dependencies installed")
@@ -167,53 +134,41 @@ def main():
     # Run the application using UV-managed environment
     print("\n🎯 Starting AFM Trainer...")
     try:
-        # Set up environment for Linux X11 compatibility
-        env = os.environ.copy()
-        if sys.platform.startswith('linux'):
-            env.update({
-                'QT_X11_NO_MITSHM': '1',
-                'XLIB_SKIP_ARGB_VISUALS': '1',
-                'XDG_SESSION_TYPE': 'x11',
-                'AFM_TRAINER_LINUX_MODE': '1',
-                'PYTHONUNBUFFERED': '1'
-            })
-        
         # Use UV to run the application with all dependencies managed
         if sys.platform.startswith('linux'):
             print("🛡️  Using Linux X11 safe mode...")
-            # On Linux, use system Python with UV packages in PYTHONPATH to avoid X11 issues
-            uv_site_packages = Path(__file__).parent / ".venv" / "lib" / "python3.11" / "site-packages"
-            env['PYTHONPATH'] = f"{uv_site_packages}:{Path(__file__).parent}:{env.get('PYTHONPATH', '')}"
-            
-            # Find a working Python with tkinter (prioritize conda/system Python)
-            working_python = None
-            for python_path in ['/usr/bin/python3', 'python3']:
-                try:
-                    test_result = subprocess.run([python_path, '-c', 'import tkinter'], 
-                                               capture_output=True, timeout=5)
-                    if test_result.returncode == 0:
-                        working_python = python_path
-                        break
-                except:
-                    continue
+            # On Linux, use system Python with UV packages in PYTHONPATH to avoid X11 issues;
+            # the environment also carries the X11 compatibility settings
+            python_path = [str(Path(__file__).parent), os.environ.get('PYTHONPATH', '')]
+            uv_site_packages = venv_site_packages()
+            if uv_site_packages:
+                python_path.insert(0, str(uv_site_packages))
+            env = {
+                **os.environ,
+                **setup_linux_environment(),
+                'PYTHONPATH': os.pathsep.join(python_path)
+            }
             
+            # Find a working Python with tkinter (prioritize system Python)
+            working_python = find_working_python_linux()
             if working_python:
                 print(f"✓ Using working Python: {working_python}")
-                result = subprocess.run([
-                    working_python, 'linux_uv_safe.py'
-                ], cwd=Path(__file__).parent, env=env)
+                run_and_exit([working_python, 'linux_uv_safe.py'], Path(__file__).parent, env)
             else:
                 print("⚠ Falling back to UV Python (may have X11 issues)")
-                result = subprocess.run([
-                    'bash', '-c', 
-                    'uv run python linux_uv_safe.py 2>&1 | grep -v "\\[xcb\\]" | grep -v "python3: .*xcb"'
-                ], cwd=Path(__file__).parent, env=env, shell=False)
+                result = subprocess.Popen(
+                    ['uv', 'run', 'python', 'linux_uv_safe.py'],
+                    cwd=Path(__file__).parent, env=env, stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT, text=True, errors='replace', bufsize=1
+                )
+                # Drop xcb noise in-process instead of piping through grep
+                for line in result.stdout:
+                    if not XCB_NOISE_PATTERN.search(line):
+                        print(line, end='', flush=True)
+                sys.exit(result.wait())
         else:
-            result = subprocess.run([
-                'uv', 'run', 'python', '-m', 'afm_trainer.afm_trainer_gui'
-            ], cwd=Path(__file__).parent, env=env)
-        
-        sys.exit(result.returncode)
+            run_and_exit(['uv', 'run', 'python', '-m', 'afm_trainer.afm_trainer_gui'],
+                         Path(__file__).parent)
         
     except KeyboardInterrupt:
         print("\n👋 AFM Trainer stopped by user")
@@ -5,10 +5,11 @@ Linux-specific launcher with proper X11 threading setup.
 """
 
 import sys
-import subprocess
 import os
 from pathlib import Path
 
+from afm_trainer._launcher import check_uv_installed, install_uv, run_command
+
 
 def setup_linux_environment():
     """Set up Linux-specific environment variables for GUI applications."""
@@ -28,29 +29,6 @@ def setup_linux_environment():
         os.environ.setdefault(key, value)
 
 
-def check_uv_installed():
-    """Check if UV is installed."""
-    try:
-        result = subprocess.run(['uv', '--version'], capture_output=True, text=True)
-        return result.returncode == 0
-    except FileNotFoundError:
-        return False
-
-
-def install_uv():
-    """Install UV package manager."""
-    print("UV not found. Installing UV...")
-    try:
-        # Install UV using the official installer for Linux
-        subprocess.run(['curl', '-LsSf', 'https://astral.sh/uv/install.sh', '|', 'sh'], 
-                      shell=True, check=True)
-        print("✓ UV installed successfully!")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"✗ Failed to install UV: {e}")
-        return False
-
-
 def main():
     """Main launcher function for Linux."""
     print("🐧 AFM Trainer Linux Launcher")
@@ -104,7 +82,7 @@ def main():
         })
         
         # Use UV to run the application with the modified environment
-        result = subprocess.run([
+        returncode = run_command([
             'uv', 'run', 'python', '-c',
             '''
 import os
@@ -132,9 +110,9 @@ except Exception as e:
     traceback.print_exc()
     sys.exit(1)
 '''
-        ], cwd=Path(__file__).parent, env=env)
+        ], Path(__file__).parent, env)
         
-        sys.exit(result.returncode)
+        sys.exit(returncode)
         
     except KeyboardInterrupt:
         print("\n👋 AFM Trainer stopped by user")
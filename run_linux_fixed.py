@@ -8,7 +8,8 @@ import sys
 import subprocess
 import os
 from pathlib import Path
-import shutil
+
+from afm_trainer._launcher import check_uv_installed, install_uv, run_command
 
 
 def check_uv_python():
@@ -53,28 +54,6 @@ def install_tkinter_instructions():
     print()
     
 
-def check_uv_installed():
-    """Check if UV is installed."""
-    try:
-        result = subprocess.run(['uv', '--version'], capture_output=True, text=True)
-        return result.returncode == 0
-    except FileNotFoundError:
-        return False
-
-
-def install_uv():
-    """Install UV package manager."""
-    print("UV not found. Installing UV...")
-    try:
-        subprocess.run(['curl', '-LsSf', 'https://astral.sh/uv/install.sh', '|', 'sh'], 
-                      shell=True, check=True)
-        print("✓ UV installed successfully!")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"✗ Failed to install UV: {e}")
-        return False
-
-
 def main():
     """Main launcher function."""
     print("🐧 AFM Trainer - Linux Launcher (Fixed)")
@@ -162,11 +141,11 @@ def main():
     try:
         # Use UV to run the application with all dependencies managed
         print("Starting with UV-managed environment...")
-        result = subprocess.run([
+        returncode = run_command([
             'uv', 'run', 'python', '-m', 'afm_trainer.afm_trainer_gui'
-        ], cwd=Path(__file__).parent, env=env)
+        ], Path(__file__).parent, env)
         
-        sys.exit(result.returncode)
+        sys.exit(returncode)
         
     except KeyboardInterrupt:
         print("\n👋 AFM Trainer stopped by user")
@@ -0,0 +1,41 @@
+"""
+Tests for adapter checkpoint ranking in the training controller.
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from afm_trainer.training_controller import _checkpoint_sort_key
+
+
+class CheckpointSortKeyTest(unittest.TestCase):
+    """Ranking used to pick the checkpoint for draft model training."""
+    
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.dir = Path(self._tmp.name)
+        
+    def _touch(self, name):
+        path = self.dir / name
+        path.touch()
+        return path
+        
+    def test_final_checkpoint_ranks_first(self):
+        paths = [self._touch(name) for name in
+                 ("adapter-9.pt", "adapter-final.pt", "adapter-10.pt", "adapter.pt")]
+        self.assertEqual(max(paths, key=_checkpoint_sort_key).name, "adapter-final.pt")
+        
+    def test_epoch_numbers_compare_numerically(self):
+        paths = [self._touch("adapter-9.pt"), self._touch("adapter-10.pt")]
+        self.assertEqual(max(paths, key=_checkpoint_sort_key).name, "adapter-10.pt")
+        
+    def test_unnamed_checkpoint_ranks_below_numbered(self):
+        paths = [self._touch("adapter.pt"), self._touch("adapter-1.pt")]
+        self.assertEqual(max(paths, key=_checkpoint_sort_key).name, "adapter-1.pt")
+        self.assertEqual(_checkpoint_sort_key(paths[0])[:2], (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
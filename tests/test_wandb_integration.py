@@ -0,0 +1,101 @@
+"""
+Tests for metric batching in the WandB integration.
+"""
+
+import queue
+import unittest
+from unittest import mock
+
+from afm_trainer import wandb_integration
+from afm_trainer.wandb_integration import WandBIntegration
+
+
+class _FakeWandB:
+    """Records wandb.log calls as (metrics, step, commit) tuples."""
+    
+    def __init__(self):
+        self.logged = []
+        
+    def log(self, metrics, step=None, commit=None):
+        self.logged.append((dict(metrics), step, commit))
+
+
+class WandBMetricsTestBase(unittest.TestCase):
+    """Enabled integration with wandb replaced by a recorder."""
+    
+    def setUp(self):
+        self.wandb = _FakeWandB()
+        patcher = mock.patch.object(wandb_integration, 'wandb', self.wandb)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.integration = WandBIntegration()
+        self.integration._set_enabled(True)
+        
+    def _flush(self, *entries):
+        metrics_queue = queue.Queue()
+        for entry in entries:
+            metrics_queue.put(entry)
+        self.integration._flush_metrics(metrics_queue)
+        return self.wandb.logged
+
+
+class FlushMetricsTest(WandBMetricsTestBase):
+    """Merging of queued entries by _flush_metrics."""
+    
+    def test_same_step_entries_are_merged(self):
+        logged = self._flush(
+            (10, {'train/loss': 0.5}, None),
+            (10, {'train/lr': 0.01}, None),
+            (11, {'train/loss': 0.4}, None),
+        )
+        self.assertEqual(logged, [
+            ({'train/loss': 0.5, 'train/lr': 0.01}, 10, None),
+            ({'train/loss': 0.4}, 11, None),
+        ])
+        
+    def test_uncommitted_entry_folds_into_next_stepless_entry(self):
+        logged = self._flush(
+            (None, {'config/epochs': 3}, False),
+            (None, {'train/loss': 0.5}, None),
+            (None, {'train/loss': 0.4}, None),
+        )
+        self.assertEqual(logged, [
+            ({'config/epochs': 3, 'train/loss': 0.5}, None, None),
+            ({'train/loss': 0.4}, None, None),
+        ])
+        
+    def test_uncommitted_entry_is_not_folded_into_explicit_step(self):
+        logged = self._flush(
+            (None, {'config/epochs': 3}, False),
+            (5, {'train/loss': 0.5}, None),
+        )
+        self.assertEqual(logged, [
+            ({'config/epochs': 3}, None, False),
+            ({'train/loss': 0.5}, 5, None),
+        ])
+
+
+class TrainingProgressTest(WandBMetricsTestBase):
+    """Windowed loss averaging in log_training_progress."""
+    
+    def test_window_average_sent_on_log_interval(self):
+        self.integration.log_interval = 4
+        for batch, loss in enumerate([1.0, 2.0, 3.0, 4.0, 5.0], 1):
+            self.integration.log_training_progress(1, batch, 8, loss)
+            
+        # Only batch 4 reaches the interval; batch 5 starts a new window
+        self.assertEqual(len(self.wandb.logged), 1)
+        metrics, step, _ = self.wandb.logged[0]
+        self.assertEqual(step, 1 * 8 + 4)
+        self.assertEqual(metrics['train/batch'], 4)
+        self.assertEqual(metrics['train/loss'], 4.0)
+        self.assertAlmostEqual(metrics['train/loss_avg'], 2.5)
+        
+        self.integration.flush_progress()
+        metrics, step, _ = self.wandb.logged[1]
+        self.assertEqual(step, 1 * 8 + 5)
+        self.assertAlmostEqual(metrics['train/loss_avg'], 5.0)
+
+
+if __name__ == "__main__":
+    unittest.main()